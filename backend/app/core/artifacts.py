@@ -0,0 +1,367 @@
+"""
+Pickle-free, memory-mappable export of the TF-IDF + XGBoost model.
+
+The joblib pickles tie loading to the exact scikit-learn version they were
+written with, and every worker unpickles its own copy of the vocabulary.
+The exported vocabulary and IDF weights are plain arrays that every process
+memory-maps, so workers share the same pages. The booster is the exception:
+XGBoost only loads a model into its own memory, so each process still holds
+a private copy of the trees (usually far smaller than the vocabulary).
+
+    python -m app.core.artifacts export     # from the pickles, verified bit-for-bit
+    python -m app.core.artifacts verify     # checksums, and agreement with the pickles
+
+Layout (ML_ARTIFACT_DIR, default app/core/model_artifacts):
+    vocab_terms.npy     vocabulary, sorted (looked up with searchsorted)
+    vocab_columns.npy   TF-IDF column of each term in vocab_terms
+    idf.npy             IDF weight of each column (absent when use_idf is off)
+    booster.ubj         the booster in XGBoost's native format
+    meta.json           analyzer parameters, normalization, class layout
+    manifest.json       SHA-256 and size of each file above
+    verified.json       size and mtime of each file when its checksums last matched
+
+The manifest replaces model_versions.json: a model is loaded only when every
+file matches its checksum, whatever scikit-learn version is installed (the
+analyzer is rebuilt from its parameters, which needs no fitted state).
+Checksums are computed at export, by `verify`, and by the first load after a
+deploy; later loads only compare sizes and mtimes with verified.json.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_ARTIFACT_DIR = Path(__file__).resolve().parent / "model_artifacts"
+MANIFEST_NAME = "manifest.json"
+META_NAME = "meta.json"
+BOOSTER_NAME = "booster.ubj"
+VERIFIED_NAME = "verified.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# TfidfVectorizer parameters that shape the analyzer; everything else is fitted state.
+ANALYZER_PARAMS = (
+    "input", "encoding", "decode_error", "strip_accents", "lowercase",
+    "preprocessor", "tokenizer", "analyzer", "stop_words", "token_pattern", "ngram_range",
+)
+
+
+class ArtifactError(Exception):
+    """The exported model is missing, incomplete or does not match its manifest."""
+
+
+def artifact_dir() -> Path:
+    return Path(settings.ML_ARTIFACT_DIR) if settings.ML_ARTIFACT_DIR else DEFAULT_ARTIFACT_DIR
+
+
+def has_artifacts(directory: Path) -> bool:
+    return (directory / MANIFEST_NAME).exists()
+
+
+class SortedVocabulary:
+    """
+    term -> column over two memory-mapped arrays: the sorted terms and their
+    columns. Supports the dict operations the scorer and the keyphrase
+    extractor use (get, in, []), plus a vectorized count for whole documents.
+    """
+
+    def __init__(self, terms, columns):
+        import numpy as np
+
+        self._np = np
+        self.terms = terms
+        self.columns = columns
+        self.max_length = terms.dtype.itemsize // 4  # "<U" stores 4 bytes per character
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _position(self, term: str) -> Optional[int]:
+        if len(term) > self.max_length:
+            return None
+        position = int(self._np.searchsorted(self.terms, term))
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return None
+
+    def get(self, term: str, default=None):
+        position = self._position(term)
+        return default if position is None else int(self.columns[position])
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._position(term) is not None
+
+    def __getitem__(self, term: str) -> int:
+        position = self._position(term)
+        if position is None:
+            raise KeyError(term)
+        return int(self.columns[position])
+
+    def count_columns(self, features: Sequence[str]) -> Dict[int, int]:
+        """Column -> occurrences for the in-vocabulary features, with one searchsorted for all of them."""
+        np = self._np
+        # Longer features can't be in the vocabulary and would be truncated by the array dtype.
+        features = [f for f in features if len(f) <= self.max_length]
+        if not features or not len(self.terms):
+            return {}
+        keys = np.array(features, dtype=self.terms.dtype)
+        positions = np.searchsorted(self.terms, keys)
+        positions[positions == len(self.terms)] = 0
+        found = self.terms[positions] == keys
+        columns, counts = np.unique(self.columns[positions[found]], return_counts=True)
+        return dict(zip(columns.tolist(), counts.tolist()))
+
+
+# --- Checksums ---
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_manifest(directory: Path, names: Iterable[str]):
+    files = {name: {"sha256": _sha256(directory / name), "bytes": (directory / name).stat().st_size} for name in sorted(names)}
+    manifest = {"format_version": FORMAT_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "files": files}
+    with open(directory / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _file_stamps(directory: Path, names: Iterable[str]) -> Dict[str, List[int]]:
+    stamps = {}
+    for name in sorted(names):
+        info = (directory / name).stat()
+        stamps[name] = [info.st_size, info.st_mtime_ns]
+    return stamps
+
+
+def _write_verified(directory: Path, manifest: Dict[str, Any]):
+    """Records that the files, as they are now, match the manifest (best effort: the directory may be read-only)."""
+    try:
+        verified = {"manifest_sha256": _sha256(directory / MANIFEST_NAME), "files": _file_stamps(directory, manifest["files"])}
+        with open(directory / VERIFIED_NAME, "w", encoding="utf-8") as f:
+            json.dump(verified, f, indent=2)
+    except OSError as e:
+        logger.debug("Could not record verified artifacts in %s: %s", directory, e)
+
+
+def _already_verified(directory: Path, manifest: Dict[str, Any]) -> bool:
+    try:
+        with open(directory / VERIFIED_NAME, encoding="utf-8") as f:
+            verified = json.load(f)
+        return (
+            verified.get("manifest_sha256") == _sha256(directory / MANIFEST_NAME)
+            and verified.get("files") == _file_stamps(directory, manifest["files"])
+        )
+    except (OSError, ValueError):
+        return False
+
+
+def verify_manifest(directory: Path, full: bool = False) -> Dict[str, Any]:
+    """
+    Checks every file against the manifest; returns the manifest or raises
+    ArtifactError. Unless `full`, files whose size and mtime are unchanged
+    since their checksums last matched are not hashed again.
+    """
+    try:
+        with open(directory / MANIFEST_NAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Unreadable manifest in {directory}: {e}")
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(f"Artifact format {manifest.get('format_version')} is not supported (expected {FORMAT_VERSION}).")
+    for name, expected in manifest["files"].items():
+        path = directory / name
+        if not path.exists():
+            raise ArtifactError(f"{name} is missing from {directory}.")
+        if path.stat().st_size != expected["bytes"]:
+            raise ArtifactError(f"{name} does not match its size in the manifest.")
+    if not full and _already_verified(directory, manifest):
+        return manifest
+    for name, expected in manifest["files"].items():
+        if _sha256(directory / name) != expected["sha256"]:
+            raise ArtifactError(f"{name} does not match its checksum in the manifest.")
+    _write_verified(directory, manifest)
+    return manifest
+
+
+# --- Export ---
+
+def _analyzer_params(vectorizer) -> Dict[str, Any]:
+    params = {name: vectorizer.get_params()[name] for name in ANALYZER_PARAMS}
+    for name in ("preprocessor", "tokenizer", "analyzer"):
+        if callable(params[name]):
+            raise NotImplementedError(f"A custom {name} can't be exported; it only exists in the pickle.")
+    if params["stop_words"] is not None and not isinstance(params["stop_words"], str):
+        params["stop_words"] = sorted(params["stop_words"])
+    params["ngram_range"] = list(params["ngram_range"])
+    return params
+
+
+def export_artifacts(vectorizer, model, directory: Path, corpus: Optional[Sequence[str]] = None) -> Path:
+    """
+    Writes the fitted vectorizer and classifier to `directory` (replacing
+    what is there) after checking that the exported scorer reproduces the
+    sklearn path bit-for-bit on `corpus` (the reference corpus by default).
+    """
+    import numpy as np
+    import sklearn
+    import xgboost
+
+    from .fast_scorer import REFERENCE_CORPUS, CompiledScorer, verify_against_reference
+
+    template = CompiledScorer.from_sklearn(vectorizer, model)
+    staging = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    vocabulary = vectorizer.vocabulary_
+    terms = sorted(vocabulary)
+    names = ["vocab_terms.npy", "vocab_columns.npy", BOOSTER_NAME, META_NAME]
+    np.save(staging / "vocab_terms.npy", np.array(terms, dtype=str) if terms else np.array([], dtype="<U1"))
+    np.save(staging / "vocab_columns.npy", np.array([vocabulary[t] for t in terms], dtype=np.int32))
+    if template.idf is not None:
+        np.save(staging / "idf.npy", template.idf)
+        names.append("idf.npy")
+    template.booster.save_model(str(staging / BOOSTER_NAME))
+
+    corpus = list(REFERENCE_CORPUS if corpus is None else corpus)
+    meta = {
+        "analyzer": _analyzer_params(vectorizer),
+        "norm": template.norm,
+        "sublinear_tf": template.sublinear_tf,
+        "binary": template.binary,
+        "n_features": template.n_features,
+        "n_classes": template.n_classes,
+        "iteration_range": list(template.iteration_range),
+        "missing": None if math.isnan(template.missing) else float(template.missing),
+        "exported_with": {"scikit-learn": sklearn.__version__, "xgboost": xgboost.__version__, "numpy": np.__version__},
+        "reference_texts": len(corpus),
+    }
+    with open(staging / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    _write_manifest(staging, names)
+
+    # Loading verifies the checksums once and records verified.json, so deployed loads skip the hashing.
+    mismatches = verify_against_reference(load_artifacts(staging), vectorizer, model, corpus)
+    if mismatches:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise ArtifactError(f"The exported model disagrees with the pickles on {len(mismatches)} of {len(corpus)} reference text(s).")
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+    return directory
+
+
+# --- Loading ---
+
+def load_artifacts(directory: Path, verify: bool = True):
+    """
+    Builds a CompiledScorer over the memory-mapped artifacts in `directory`.
+    The vocabulary and IDF arrays are shared between processes; the booster
+    is a private copy in each one.
+    """
+    import numpy as np
+    import xgboost
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from .fast_scorer import CompiledScorer
+
+    if verify:
+        verify_manifest(directory)
+    elif not has_artifacts(directory):
+        raise ArtifactError(f"No exported model in {directory}.")
+    with open(directory / META_NAME, encoding="utf-8") as f:
+        meta = json.load(f)
+
+    params = dict(meta["analyzer"])
+    params["ngram_range"] = tuple(params["ngram_range"])
+    analyzer = TfidfVectorizer(**params).build_analyzer()
+
+    vocabulary = SortedVocabulary(
+        np.load(directory / "vocab_terms.npy", mmap_mode="r"),
+        np.load(directory / "vocab_columns.npy", mmap_mode="r"),
+    )
+    idf_path = directory / "idf.npy"
+    idf = np.load(idf_path, mmap_mode="r") if idf_path.exists() else None
+
+    booster = xgboost.Booster()
+    booster.load_model(str(directory / BOOSTER_NAME))
+
+    return CompiledScorer(
+        analyzer=analyzer,
+        vocabulary=vocabulary,
+        idf=idf,
+        n_features=meta["n_features"],
+        booster=booster,
+        iteration_range=tuple(meta["iteration_range"]),
+        n_classes=meta["n_classes"],
+        missing=np.nan if meta["missing"] is None else meta["missing"],
+        norm=meta["norm"],
+        sublinear_tf=meta["sublinear_tf"],
+        binary=meta["binary"],
+    )
+
+
+def _load_pickles():
+    import joblib
+
+    from .ml_model import MODEL_PATH, VECTORIZER_PATH
+
+    return joblib.load(str(VECTORIZER_PATH)), joblib.load(str(MODEL_PATH))
+
+
+def _read_corpus(path: Optional[str]) -> Optional[List[str]]:
+    if path is None:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def main():
+    import argparse
+
+    from .fast_scorer import REFERENCE_CORPUS, verify_against_reference
+    from .logging_config import setup_logging
+
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Export or verify the memory-mappable model artifacts.")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--dir", type=Path, default=None, help="Artifact directory (default: ML_ARTIFACT_DIR or app/core/model_artifacts).")
+    parser.add_argument("--corpus", help="File with one text per line to check against the pickles (default: the reference corpus).")
+    args = parser.parse_args()
+    directory = args.dir or artifact_dir()
+    corpus = _read_corpus(args.corpus)
+
+    vectorizer, model = _load_pickles()
+    if args.command == "export":
+        export_artifacts(vectorizer, model, directory, corpus)
+        print(f"Exported the model to {directory}")
+        return 0
+
+    try:
+        verify_manifest(directory, full=True)
+        scorer = load_artifacts(directory, verify=False)
+    except ArtifactError as e:
+        print(e)
+        return 1
+    corpus = corpus if corpus is not None else REFERENCE_CORPUS
+    mismatches = verify_against_reference(scorer, vectorizer, model, corpus)
+    print(f"Checksums OK. Checked {len(corpus)} texts against the pickles: {len(mismatches)} mismatch(es).")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
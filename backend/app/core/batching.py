@@ -0,0 +1,130 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+BatchFunction = Callable[[List[str]], Awaitable[List[dict]]]
+
+# Upper bounds of the batch-size histogram buckets reported by stats().
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction requests into small batches.
+
+    The first request to arrive opens a batch window. The batch is flushed when
+    it reaches `max_batch_size` or when `max_wait_ms` has passed, whichever
+    comes first. Each batch is scored with one call to `batch_fn` and every
+    caller receives its own result.
+    """
+
+    def __init__(self, batch_fn: BatchFunction, max_batch_size: int, max_wait_ms: float):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()  # keeps running batches referenced until they finish
+
+        # Metrics
+        self.total_batches = 0
+        self.total_items = 0
+        self.max_observed_batch_size = 0
+        self.total_batch_seconds = 0.0
+        self._size_histogram: Dict[str, int] = {self._bucket_label(b): 0 for b in BATCH_SIZE_BUCKETS}
+        self._size_histogram["+Inf"] = 0
+
+    async def predict(self, text: str) -> dict:
+        """Queues a text for the next batch and waits for its verdict."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush_now)
+
+        return await future
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+        # Anything left over starts a new window straight away.
+        if self._pending:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.max_wait, self._flush_now)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Callers that went away while waiting don't need scoring.
+        live = [(text, future) for text, future in batch if not future.done()]
+        if not live:
+            return
+
+        started = time.perf_counter()
+        try:
+            results = await self.batch_fn([text for text, _ in live])
+            if len(results) != len(live):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(live)} inputs")
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record_batch(len(live), time.perf_counter() - started)
+
+        for (_, future), result in zip(live, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Scores whatever is still queued and waits for the running batches, for shutdown."""
+        while self._pending:
+            self._flush_now()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    @staticmethod
+    def _bucket_label(upper: int) -> str:
+        return f"<={upper}"
+
+    def _record_batch(self, size: int, seconds: float):
+        self.total_batches += 1
+        self.total_items += size
+        self.total_batch_seconds += seconds
+        self.max_observed_batch_size = max(self.max_observed_batch_size, size)
+        for upper in BATCH_SIZE_BUCKETS:
+            if size <= upper:
+                self._size_histogram[self._bucket_label(upper)] += 1
+                break
+        else:
+            self._size_histogram["+Inf"] += 1
+
+    def stats(self) -> dict:
+        """Returns metrics about the batch sizes achieved so far."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.total_batches,
+            "items": self.total_items,
+            "pending": len(self._pending),
+            "running_batches": len(self._batches),
+            "mean_batch_size": round(self.total_items / self.total_batches, 2) if self.total_batches else 0.0,
+            "max_observed_batch_size": self.max_observed_batch_size,
+            "mean_batch_ms": round(self.total_batch_seconds * 1000.0 / self.total_batches, 3) if self.total_batches else 0.0,
+            "batch_size_histogram": dict(self._size_histogram),
+        }
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Component states reported by /ready
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyComponent:
+    """
+    A heavy dependency (model, client, native binding) that is loaded on first
+    use instead of at import time. Loading is thread-safe and happens once;
+    a failed load is remembered so requests don't retry it on every call,
+    but an explicit warm-up can retry it.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.state = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    def get(self, retry_failed: bool = False) -> Any:
+        """Returns the loaded value (loading it if needed), or None if loading failed."""
+        if self.state == READY or (self.state == FAILED and not retry_failed):
+            return self._value
+        with self._lock:
+            if self.state == READY or (self.state == FAILED and not retry_failed):
+                return self._value
+            self.state = LOADING
+            started = time.perf_counter()
+            try:
+                self._value = self.loader()
+                self.state = READY
+                self.error = None
+                logger.info("Component '%s' loaded in %.2fs.", self.name, time.perf_counter() - started)
+            except Exception as e:
+                self._value = None
+                self.state = FAILED
+                self.error = str(e)
+                logger.error("Component '%s' failed to load: %s", self.name, e)
+            self.load_seconds = time.perf_counter() - started
+            return self._value
+
+    async def get_async(self, retry_failed: bool = False) -> Any:
+        """Like get(), but loads in a worker thread so the event loop keeps serving."""
+        if self.state == READY:
+            return self._value
+        return await asyncio.to_thread(self.get, retry_failed)
+
+    def reset(self):
+        """Drops the loaded value; the next get() loads it again (e.g. after its files were rebuilt)."""
+        with self._lock:
+            self._value = None
+            self.state = NOT_LOADED
+            self.error = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+        }
+
+
+components: Dict[str, LazyComponent] = {}
+
+
+def register_component(name: str, loader: Callable[[], Any]) -> LazyComponent:
+    component = LazyComponent(name, loader)
+    components[name] = component
+    return component
+
+
+async def warm_up(names: Optional[Iterable[str]] = None, retry_failed: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Loads the named components (all of them by default) concurrently in worker threads."""
+    selected = [components[n] for n in (names if names is not None else components) if n in components]
+    await asyncio.gather(*(c.get_async(retry_failed) for c in selected))
+    return {c.name: c.status() for c in selected}
+
+
+def readiness() -> Dict[str, Dict[str, Any]]:
+    return {name: component.status() for name, component in components.items()}
@@ -8,6 +8,130 @@ class Settings(BaseSettings):
     X_BEARER_TOKEN: str | None = None
     GEMINI_API_KEY: str | None  #optional in dev
 
+    # --- Logging ---
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False                 # one JSON object per line instead of plain text
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.01  # fraction of raw payloads logged when LOG_LEVEL is DEBUG
+    LOG_PAYLOAD_MAX_CHARS: int = 2000
+
+    # --- Startup / lazy components ---
+    WARMUP_ON_STARTUP: bool = True
+    WARMUP_COMPONENTS: list[str] = ["ml_model", "openai", "ocr", "whisper", "passage_index"]  # loaded in the background after startup
+    READY_REQUIRED_COMPONENTS: list[str] = ["ml_model"]  # /ready reports 503 until these are loaded
+    WHISPER_MODEL_NAME: str = "base"
+
+    # --- Voice transcription ---
+    VOICE_MAX_DURATION_SECONDS: int = 600    # audio past this point is never decoded
+    VOICE_CHUNK_SECONDS: float = 30.0        # Whisper's window; chunks are cut at silences before this
+    VOICE_SILENCE_SEARCH_SECONDS: float = 5.0
+    VOICE_ANALYSIS_MIN_WORDS: int = 0        # stop transcribing once this much text exists (0 = never); responses say so
+
+    # --- Article fetching ---
+    ARTICLE_FETCH_TIMEOUT_SECONDS: float = 10.0
+    ARTICLE_MAX_BYTES: int = 2 * 1024 * 1024   # download cap per article
+    ARTICLE_CACHE_ENABLED: bool = True
+    ARTICLE_CACHE_DIR: str | None = None        # defaults to backend/.cache/articles
+    ARTICLE_CACHE_TTL_SECONDS: int = 900        # freshness when the site sends no max-age
+    ARTICLE_CACHE_MAX_ENTRIES: int = 10000      # least recently used entries are evicted beyond this
+    ARTICLE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    ARTICLE_CACHE_PRUNE_AFTER_SECONDS: int = 7 * 24 * 3600  # entries expired this long are deleted
+    ARTICLE_CACHE_PRUNE_INTERVAL_SECONDS: float = 300.0     # at most one eviction pass per interval
+
+    # --- OCR ---
+    OCR_MAX_WORKERS: int = 2            # tesseract processes running at once
+    OCR_MAX_QUEUE: int = 16             # images allowed to wait for a worker
+    OCR_TARGET_DPI: int = 300
+    OCR_MAX_DIMENSION: int = 2000       # long side cap after rescaling
+    OCR_MAX_IMAGES_PER_REQUEST: int = 10
+
+    # --- Perceptual-hash OCR cache ---
+    PHASH_CACHE_ENABLED: bool = True
+    PHASH_CACHE_MAX_ENTRIES: int = 50000
+    PHASH_MAX_DISTANCE: int = 6         # Hamming distance (of 64 bits) still treated as the same image
+
+    # --- ML micro-batching ---
+    ML_BATCH_ENABLED: bool = True
+    ML_BATCH_MAX_SIZE: int = 32        # max texts scored in a single transform/predict_proba
+    ML_BATCH_MAX_WAIT_MS: float = 5.0  # how long the first request in a batch waits for company
+
+    ML_FAST_SCORER_ENABLED: bool = True  # single-pass scorer, verified against sklearn at load
+    ML_ARTIFACTS_ENABLED: bool = True    # prefer the memory-mapped export (python -m app.core.artifacts export) over the pickles
+    ML_ARTIFACT_DIR: str | None = None   # defaults to app/core/model_artifacts
+
+    # --- ML scoring executor ---
+    ML_EXECUTOR_KIND: str = "thread"   # "thread" or "process"
+    ML_EXECUTOR_WORKERS: int = 2
+    ML_EXECUTOR_MAX_QUEUE: int = 64    # scoring jobs allowed in flight before callers wait
+    ML_EXECUTOR_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # --- ML / LLM cascade ---
+    ANALYSIS_LLM_MODE: str = "cascade"       # "always", "cascade" or "speculative"
+    CASCADE_CONFIDENCE_THRESHOLD: int = 80   # ML confidence (0-100) needed to skip the LLM
+    CASCADE_MIN_WORDS: int = 20              # shorter texts always go to the LLM
+
+    # --- Latency budgets for the external fan-out ---
+    ANALYSIS_DEADLINE_SECONDS: float = 8.0   # overall; missing sources are reported as TIMEOUT
+    OPENAI_BUDGET_SECONDS: float = 7.0
+    X_BUDGET_SECONDS: float = 3.0
+    REDDIT_BUDGET_SECONDS: float = 3.0
+
+    # --- Batch analysis endpoint ---
+    BATCH_ML_CHUNK_SIZE: int = 256      # texts vectorized and scored together
+    BATCH_MAX_CONCURRENCY: int = 32     # upper bound for full-analysis fan-out per request
+
+    # --- Feedback write-behind buffer ---
+    FEEDBACK_BUFFER_ENABLED: bool = True
+    FEEDBACK_BATCH_MAX_SIZE: int = 500          # documents per insert_many
+    FEEDBACK_FLUSH_INTERVAL_MS: float = 200.0   # longest a buffered document waits for its batch
+    FEEDBACK_BUFFER_MAX_PENDING: int = 10000    # beyond this /feedback answers 503
+    FEEDBACK_MAX_RETRIES: int = 5               # transient failures before a document is dropped
+    FEEDBACK_SHUTDOWN_FLUSH_SECONDS: float = 10.0
+
+    # --- Verdict cache ---
+    VERDICT_CACHE_ENABLED: bool = True
+    VERDICT_CACHE_MAX_ENTRIES: int = 10000
+    VERDICT_CACHE_TTL_SECONDS: int = 3600
+    VERDICT_CACHE_SHARED: bool = False  # also share entries across workers through MongoDB
+
+    # --- Upstream endpoints (pointed at local stubs by the load benchmarks) ---
+    X_API_BASE_URL: str = "https://api.x.com/2/"
+    REDDIT_API_BASE_URL: str = "https://oauth.reddit.com/"
+    OPENAI_BASE_URL: str | None = None   # None = the OpenAI client's default
+
+    # --- Outbound HTTP to X / Reddit (shared client, rate limits, circuit breaker) ---
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP2_ENABLED: bool = True           # used only when the h2 package is installed
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_MAX_RETRIES: int = 1            # retries on connection errors and 502/503/504
+    HTTP_RETRY_BACKOFF_SECONDS: float = 0.2
+    HTTP_RATE_LIMIT_MAX_WAIT_SECONDS: float = 1.0  # longer waits for a token fail fast instead
+    X_RATE_LIMIT_PER_SECOND: float = 0.5  # recent search: 450 requests / 15 min
+    X_RATE_LIMIT_BURST: int = 5
+    REDDIT_RATE_LIMIT_PER_SECOND: float = 1.5
+    REDDIT_RATE_LIMIT_BURST: int = 10
+    CIRCUIT_FAILURE_THRESHOLD: int = 5   # consecutive failures before requests fail fast
+    CIRCUIT_RESET_SECONDS: float = 30.0  # how long the circuit stays open before a probe
+
+    # --- Social media search queries ---
+    SOCIAL_QUERY_MAX_TERMS: int = 4        # keyphrases per X/Reddit search
+    SOCIAL_CACHE_ENABLED: bool = True
+    SOCIAL_CACHE_MAX_ENTRIES: int = 5000
+    SOCIAL_CACHE_TTL_SECONDS: int = 600
+
+    # --- PDF verification store (filled by `python -m app.services.pdf_store`) ---
+    PDF_STORE_DIR: str | None = None  # defaults to backend/.cache/pdf_store
+    PDF_DOWNLOAD_TIMEOUT_SECONDS: float = 20.0
+    PDF_FETCH_CONCURRENCY: int = 4    # concurrent PDF downloads (ingestion and missing-document fallback)
+    PDF_PARSE_WORKERS: int = 2        # PyMuPDF process pool
+    PDF_PAGES_PER_TASK: int = 8       # pages parsed per pool task; results stream back range by range
+    VERIFICATION_FETCH_MISSING: bool = False  # scan keyword-matched PDFs missing from the store, then ingest them in the background
+    VERIFICATION_FETCH_RETRY_SECONDS: float = 600.0  # before a document that failed to ingest is tried again
+    PASSAGE_INDEX_DIR: str | None = None  # defaults to backend/.cache/passage_index
+    PASSAGE_INDEX_CHECK_SECONDS: float = 5.0  # how often workers look for a new build (or retry a failed load)
+    VERIFICATION_TOP_K: int = 3
+
     @property
     def is_gemini_configured(self) -> bool:
         return bool(self.GEMINI_API_KEY and self.GEMINI_API_KEY.startswith("sk-"))
@@ -0,0 +1,206 @@
+import math
+import sys
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+# A handful of texts used to check the compiled path against the sklearn path
+# whenever a scorer is built. Pass a larger corpus to verify_against_reference()
+# (or run this module with a file of texts) for a fuller check.
+REFERENCE_CORPUS = [
+    "The government announced a new scheme offering free laptops to all students.",
+    "Scientists confirm the vaccine was tested in clinical trials involving thousands of volunteers.",
+    "BREAKING!!! Forward this message to 10 people or your account will be deleted tonight!!!",
+    "The central bank kept interest rates unchanged on Thursday, citing stable inflation.",
+    "Drinking hot water every fifteen minutes kills the virus, doctors don't want you to know.",
+    "",
+    "a",
+    "Officials said the bridge will reopen next month after repairs to the damaged pillars are completed. "
+    "The ministry added that traffic diversions will remain in place until then. " * 8,
+]
+
+
+class CompiledScorer:
+    """
+    Single-pass TF-IDF + XGBoost scorer built from the loaded artifacts.
+
+    It reproduces TfidfVectorizer.transform() directly (token -> column lookup,
+    IDF weights as a NumPy array, CSR row built by hand) and scores the result
+    once on the raw booster, skipping the sklearn wrapper's per-call validation.
+    Probabilities are returned in the same layout and dtype as
+    XGBClassifier.predict_proba().
+    """
+
+    def __init__(
+        self,
+        analyzer: Callable[[str], List[str]],
+        vocabulary: Mapping[str, int],
+        idf: Optional[np.ndarray],
+        n_features: int,
+        booster,
+        iteration_range: Tuple[int, int],
+        n_classes: int,
+        missing: float = np.nan,
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+    ):
+        if norm not in (None, "l1", "l2"):
+            raise NotImplementedError(f"Unsupported TF-IDF norm: {norm!r}")
+        self.analyzer = analyzer
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.n_features = n_features
+        self.booster = booster
+        self.iteration_range = iteration_range
+        self.n_classes = n_classes
+        self.missing = missing
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model) -> "CompiledScorer":
+        """Builds a scorer from a fitted TfidfVectorizer and XGBClassifier."""
+        if np.dtype(vectorizer.dtype) != np.float64:
+            raise NotImplementedError(f"Only float64 vectorizers are supported, got {vectorizer.dtype}")
+
+        use_idf = getattr(vectorizer, "use_idf", True)
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64) if use_idf else None
+
+        try:
+            iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            iteration_range = (0, 0)
+        if getattr(model, "booster", None) == "gblinear":
+            iteration_range = (0, 0)
+
+        return cls(
+            analyzer=vectorizer.build_analyzer(),
+            vocabulary=vectorizer.vocabulary_,
+            idf=idf,
+            n_features=len(vectorizer.vocabulary_),
+            booster=model.get_booster(),
+            iteration_range=iteration_range,
+            n_classes=int(getattr(model, "n_classes_", 2)),
+            missing=model.missing,
+            norm=vectorizer.norm,
+            sublinear_tf=vectorizer.sublinear_tf,
+            binary=vectorizer.binary,
+        )
+
+    def _count_columns(self, features: List[str]) -> Dict[int, int]:
+        # Memory-mapped vocabularies (see artifacts.SortedVocabulary) look up all features at once.
+        count_columns = getattr(self.vocabulary, "count_columns", None)
+        if count_columns is not None:
+            return count_columns(features)
+        vocabulary = self.vocabulary
+        counts: Dict[int, int] = {}
+        for feature in features:
+            column = vocabulary.get(feature)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        return counts
+
+    def _row(self, text: str) -> Tuple[List[int], List[float]]:
+        """Returns the sorted column indices and TF-IDF values for one text."""
+        counts = self._count_columns(self.analyzer(text))
+        if not counts:
+            return [], []
+
+        columns = sorted(counts)
+        if self.binary:
+            values = [1.0] * len(columns)
+        else:
+            values = [float(counts[c]) for c in columns]
+        if self.sublinear_tf:
+            values = [math.log(v) + 1.0 for v in values]
+        if self.idf is not None:
+            idf = self.idf
+            values = [v * float(idf[c]) for v, c in zip(values, columns)]
+
+        if self.norm is not None:
+            # sklearn's `X * idf_diag` leaves each row in descending column
+            # order and the row norm is accumulated in that order, so sum the
+            # same way to get an identical float.
+            ordered = reversed(values) if self.idf is not None else values
+            total = 0.0
+            if self.norm == "l2":
+                for v in ordered:
+                    total += v * v
+                total = math.sqrt(total) if total != 0.0 else 0.0
+            else:
+                for v in ordered:
+                    total += abs(v)
+            if total != 0.0:
+                values = [v / total for v in values]
+        return columns, values
+
+    def transform(self, texts: Sequence[str]) -> sp.csr_matrix:
+        """Vectorizes texts exactly like the fitted TfidfVectorizer."""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for text in texts:
+            columns, values = self._row(text)
+            indices.extend(columns)
+            data.extend(values)
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(texts), self.n_features),
+        )
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """One booster call for all texts; returns an (n_texts, n_classes) array."""
+        return self.predict_matrix(self.transform(texts))
+
+    def predict_matrix(self, features: sp.csr_matrix) -> np.ndarray:
+        """Scores rows already produced by transform()."""
+        predictions = self.booster.inplace_predict(
+            features,
+            iteration_range=self.iteration_range,
+            predict_type="value",
+            missing=self.missing,
+            validate_features=False,
+        )
+        if predictions.ndim == 2 and predictions.shape[1] == self.n_classes:
+            return predictions
+        # Binary objective: the booster only returns P(class 1).
+        return np.vstack((1.0 - predictions, predictions)).transpose()
+
+
+def verify_against_reference(scorer: CompiledScorer, vectorizer, model, corpus: Sequence[str] = REFERENCE_CORPUS) -> List[int]:
+    """
+    Scores `corpus` through both paths and returns the indices of texts whose
+    probabilities are not bit-for-bit identical. An empty list means a match.
+    """
+    texts = list(corpus)
+    if not texts:
+        return []
+    expected = np.asarray(model.predict_proba(vectorizer.transform(texts)))
+    actual = np.asarray(scorer.predict_proba(texts))
+    if expected.shape != actual.shape or expected.dtype != actual.dtype:
+        return list(range(len(texts)))
+    return [i for i in range(len(texts)) if expected[i].tobytes() != actual[i].tobytes()]
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.core.fast_scorer corpus.txt   (one text per line)
+    from . import ml_model
+
+    if not ml_model.load_components():
+        sys.exit("ML components are not available.")
+    if ml_model.vectorizer is None:
+        sys.exit("The model was loaded from the exported artifacts; check it with `python -m app.core.artifacts verify`.")
+    corpus = REFERENCE_CORPUS
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            corpus = [line.rstrip("\n") for line in f]
+    scorer = CompiledScorer.from_sklearn(ml_model.vectorizer, ml_model.model)
+    mismatches = verify_against_reference(scorer, ml_model.vectorizer, ml_model.model, corpus)
+    print(f"Checked {len(corpus)} texts: {len(mismatches)} mismatch(es).")
+    for i in mismatches[:20]:
+        print(f"  line {i + 1}: {corpus[i][:80]!r}")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,144 @@
+"""
+Application logging.
+
+Records are handed to a queue on the calling thread and written to stderr by
+a single listener thread, so logging never blocks the event loop on I/O.
+Each record carries the correlation ID of the request that produced it.
+Verbose payloads (raw upstream responses, etc.) go through log_payload(),
+which is sampled and never serializes anything unless DEBUG is enabled.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import uuid
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from .config.settings import settings
+
+APP_LOGGER = "app"
+REQUEST_ID_HEADER = "x-request-id"
+
+# Correlation ID of the request being handled; inherited by tasks and to_thread() calls.
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current request ID (runs on the calling thread, where the context is)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging():
+    """Routes the `app` loggers through a queue to a background writer. Safe to call more than once."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler()
+    if settings.LOG_JSON:
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Writes out everything still queued and stops the writer thread."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger(APP_LOGGER).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, sample_rate: Optional[float] = None):
+    """
+    Logs a large payload at DEBUG for a sampled fraction of calls. When DEBUG
+    is off or the call isn't sampled, the payload is never serialized.
+    `payload` may be a zero-argument callable that builds it.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = settings.LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    if callable(payload):
+        payload = payload()
+    try:
+        text = json.dumps(payload, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        text = repr(payload)
+    limit = settings.LOG_PAYLOAD_MAX_CHARS
+    if len(text) > limit:
+        text = f"{text[:limit]}... ({len(text)} chars)"
+    logger.debug("%s: %s", message, text)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that gives every request a correlation ID: the incoming
+    X-Request-ID header when present, a fresh one otherwise. The ID is echoed
+    back in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,268 @@
+"""
+Minimal in-process metrics with Prometheus text exposition (served at /metrics).
+
+Recording is a lock, a bisect and a couple of additions, so instrumentation
+stays on in production. Callback metrics read existing stats() counters at
+scrape time, so caches don't need to be instrumented twice.
+"""
+import bisect
+import math
+import threading
+import time
+from asyncio import CancelledError
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond cache hits up to multi-second upstream calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        key = tuple(str(kwargs[n]) for n in self.labelnames) if kwargs else tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Sequence[float]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose samples are read from `collect()` at scrape time: {label values: value}."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Dict[LabelValues, float]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def _samples(self):
+        suffix = "_total" if self.kind == "counter" else ""
+        for key, value in self.collect().items():
+            yield f"{self.name}{suffix}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # a broken callback must not take down the whole scrape
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "analysis_stage_duration_seconds", "Latency of each pipeline stage.", ["stage"]))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "analysis_stage_errors", "Stage runs that raised or returned an error.", ["stage"]))
+STAGE_TIMEOUTS = REGISTRY.register(Counter(
+    "analysis_stage_timeouts", "Stage runs abandoned because their latency budget ran out.", ["stage"]))
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "analysis_stage_in_flight", "Stage runs currently in progress.", ["stage"]))
+
+# name -> callable returning (hits, misses)
+_caches: Dict[str, Callable[[], Tuple[float, float]]] = {}
+
+
+def _collect_caches(index: int) -> Callable[[], Dict[LabelValues, float]]:
+    def collect():
+        return {(name,): read()[index] for name, read in list(_caches.items())}
+    return collect
+
+
+def _collect_hit_ratios() -> Dict[LabelValues, float]:
+    ratios = {}
+    for name, read in list(_caches.items()):
+        hits, misses = read()
+        ratios[(name,)] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+REGISTRY.register(CallbackMetric("cache_hits", "Cache lookups served from the cache.", ["cache"], _collect_caches(0), kind="counter"))
+REGISTRY.register(CallbackMetric("cache_misses", "Cache lookups that went to the source.", ["cache"], _collect_caches(1), kind="counter"))
+REGISTRY.register(CallbackMetric("cache_hit_ratio", "Hits / lookups since startup.", ["cache"], _collect_hit_ratios))
+
+
+def register_cache(name: str, read: Callable[[], Tuple[float, float]]):
+    """Exposes a cache's (hits, misses) counters as cache_hits/cache_misses/cache_hit_ratio{cache=name}."""
+    _caches[name] = read
+
+
+def register_gauge(name: str, documentation: str, read: Callable[[], float]):
+    """Exposes a value read at scrape time (queue depths, pool sizes, ...)."""
+    REGISTRY.register(CallbackMetric(name, documentation, (), lambda: {(): read()}))
+
+
+class track_stage:
+    """
+    Times a block as one run of `stage` (sync or async code alike):
+
+        with track_stage("openai"):
+            ...
+
+    Exceptions count as errors, except cancellation (see record_timeout).
+    Call .error() inside the block for failures that don't raise.
+    """
+    __slots__ = ("stage", "started", "failed")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.failed = False
+
+    def error(self):
+        self.failed = True
+
+    def __enter__(self):
+        STAGE_IN_FLIGHT.labels(self.stage).inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_LATENCY.labels(self.stage).observe(time.perf_counter() - self.started)
+        STAGE_IN_FLIGHT.labels(self.stage).dec()
+        if self.failed or (exc_type is not None and not issubclass(exc_type, CancelledError)):
+            STAGE_ERRORS.labels(self.stage).inc()
+        return False
+
+
+def record_timeout(stage: str):
+    STAGE_TIMEOUTS.labels(stage).inc()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
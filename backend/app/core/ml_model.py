@@ -1,30 +1,12 @@
+import logging
 from pathlib import Path
+from typing import List
 import json
+from .config.settings import settings
+from .components import register_component
+from .metrics import track_stage
 
-# Import required packages with error handling
-try:
-    import joblib
-    JOBLIB_AVAILABLE = True
-except ImportError:
-    print("joblib not available. Please install it with: pip install joblib")
-    JOBLIB_AVAILABLE = False
-
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    print("numpy not available. Please install it with: pip install numpy")
-    NUMPY_AVAILABLE = False
-
-try:
-    from sklearn import __version__ as sklearn_version
-    import xgboost
-    ML_PACKAGES_AVAILABLE = True
-except ImportError as e:
-    print(f"ML packages not available: {e}")
-    print("Please install required packages: pip install scikit-learn xgboost")
-    ML_PACKAGES_AVAILABLE = False
-    sklearn_version = None
+logger = logging.getLogger(__name__)
 
 # --- 1. Configuration ---
 CORE_DIR = Path(__file__).resolve().parent
@@ -35,121 +17,194 @@ VERSIONS_PATH = CORE_DIR / "model_versions.json"
 CLASS_LABELS = ["Real", "Fake"]
 
 # --- 2. Version and Component Loading ---
+# Nothing heavy happens at import time: the ML packages and the model are loaded
+# on first use (or by the startup warm-up) through the "ml_model" component.
+# The memory-mapped export (see artifacts.py) is preferred when present; the
+# pickles are the fallback.
 
 model = None
 vectorizer = None
+scorer = None  # CompiledScorer fast path, None when it can't reproduce the sklearn path
+np = None
+
+
+def _check_versions(sklearn_version: str):
+    # Load the required versions from the JSON file
+    if not VERSIONS_PATH.exists():
+        logger.warning("Model versions file not found!")
+        return
+    with open(VERSIONS_PATH, 'r') as f:
+        required_versions = json.load(f)
+
+    required_sklearn_version = required_versions.get("scikit-learn")
+
+    # Check if the current scikit-learn version matches the required version
+    if sklearn_version != required_sklearn_version:
+        logger.warning(
+            "Scikit-learn version mismatch! Model was trained with %s, installed is %s. "
+            "This can cause unexpected errors or incorrect predictions. Please run: pip install scikit-learn==%s",
+            required_sklearn_version, sklearn_version, required_sklearn_version,
+        )
+
+
+def _load_artifact_scorer():
+    """The scorer over the exported artifacts, or None when there are none (or they fail their checksums)."""
+    from .artifacts import ArtifactError, artifact_dir, has_artifacts, load_artifacts
+
+    directory = artifact_dir()
+    if not has_artifacts(directory):
+        logger.info("No exported model in %s; loading the pickles.", directory)
+        return None
+    try:
+        loaded_scorer = load_artifacts(directory)
+    except ArtifactError as e:
+        logger.error("Exported model in %s is unusable (%s); loading the pickles.", directory, e)
+        return None
+    logger.info("Machine Learning model loaded from the exported artifacts in %s.", directory)
+    return loaded_scorer
+
+
+def _load_ml_components():
+    global model, vectorizer, scorer, np
+
+    if settings.ML_ARTIFACTS_ENABLED:
+        loaded_scorer = _load_artifact_scorer()
+        if loaded_scorer is not None:
+            import numpy
+            np = numpy
+            # Only the scorer exists on this path; there is no sklearn object to fall back on.
+            model, vectorizer, scorer = None, None, loaded_scorer
+            return scorer
+
+    # Import required packages with error handling
+    try:
+        import joblib
+        import numpy
+        from sklearn import __version__ as sklearn_version
+        import xgboost  # noqa: F401  (needed to unpickle the model)
+    except ImportError as e:
+        logger.error(
+            "Required ML packages are not available! (%s) Please install required packages: "
+            "pip install joblib numpy scikit-learn xgboost", e,
+        )
+        raise
+
+    _check_versions(sklearn_version)
+
+    # Load the model and vectorizer
+    if not MODEL_PATH.exists():
+        logger.error("Model file not found at %s", MODEL_PATH)
+        raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
+    if not VECTORIZER_PATH.exists():
+        logger.error("Vectorizer file not found at %s", VECTORIZER_PATH)
+        raise FileNotFoundError(f"Vectorizer file not found at {VECTORIZER_PATH}")
 
-if not all([ML_PACKAGES_AVAILABLE, JOBLIB_AVAILABLE, NUMPY_AVAILABLE]):
-    print("="*80)
-    print("ERROR: Required ML packages are not available!")
-    if not ML_PACKAGES_AVAILABLE:
-        print("Missing: scikit-learn and/or xgboost")
-    if not JOBLIB_AVAILABLE:
-        print("Missing: joblib")
-    if not NUMPY_AVAILABLE:
-        print("Missing: numpy")
-    print("Please install all required packages before running the model.")
-    print("="*80)
-else:
     try:
-        # Load the required versions from the JSON file
-        if not VERSIONS_PATH.exists():
-            print("WARNING: Model versions file not found!")
-        else:
-            with open(VERSIONS_PATH, 'r') as f:
-                required_versions = json.load(f)
-            
-            required_sklearn_version = required_versions.get("scikit-learn")
-
-            # Check if the current scikit-learn version matches the required version
-            if sklearn_version != required_sklearn_version:
-                print("="*80)
-                print(f"WARNING: Scikit-learn version mismatch!")
-                print(f"Model was trained with version: {required_sklearn_version}")
-                print(f"You have version installed:     {sklearn_version}")
-                print("This can cause unexpected errors or incorrect predictions.")
-                print(f"Please run: pip install scikit-learn=={required_sklearn_version}")
-                print("="*80)
-
-        # Load the model and vectorizer
-        if not MODEL_PATH.exists():
-            print(f"ERROR: Model file not found at {MODEL_PATH}")
-            raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
-        if not VECTORIZER_PATH.exists():
-            print(f"ERROR: Vectorizer file not found at {VECTORIZER_PATH}")
-            raise FileNotFoundError(f"Vectorizer file not found at {VECTORIZER_PATH}")
+        loaded_model = joblib.load(str(MODEL_PATH))
+        loaded_vectorizer = joblib.load(str(VECTORIZER_PATH))
+        logger.info("Machine Learning model and vectorizer loaded successfully.")
+    except Exception as e:
+        logger.error("Failed to load ML components: %s. The predict function will return a default 'Uncertain' value.", e)
+        raise RuntimeError(f"Failed to load ML components: {e}")
 
+    # Build the single-pass scorer and make sure it matches the sklearn path exactly.
+    loaded_scorer = None
+    if settings.ML_FAST_SCORER_ENABLED:
         try:
-            model = joblib.load(str(MODEL_PATH))
-            vectorizer = joblib.load(str(VECTORIZER_PATH))
-            print("Machine Learning model and vectorizer loaded successfully.")
+            from .fast_scorer import CompiledScorer, verify_against_reference
+            candidate = CompiledScorer.from_sklearn(loaded_vectorizer, loaded_model)
+            mismatches = verify_against_reference(candidate, loaded_vectorizer, loaded_model)
+            if mismatches:
+                logger.warning("Compiled scorer disagrees with sklearn on %d reference text(s). Using the sklearn path.", len(mismatches))
+            else:
+                loaded_scorer = candidate
+                logger.info("Compiled scorer verified against the reference corpus.")
         except Exception as e:
-            print(f"ERROR: Failed to load ML components: {e}")
-            raise RuntimeError(f"Failed to load ML components: {e}")
+            logger.warning("Compiled scorer unavailable, using the sklearn path: %s", e)
+
+    np = numpy
+    model, vectorizer, scorer = loaded_model, loaded_vectorizer, loaded_scorer
+    return model
+
+
+ml_component = register_component("ml_model", _load_ml_components)
+
+
+def load_components() -> bool:
+    """Loads the ML components if they aren't loaded yet. Returns True when they are usable."""
+    ml_component.get()
+    return scorer is not None or (model is not None and vectorizer is not None)
+
+
+# --- 3. Prediction Functions ---
+ML_EXPLANATION = "This verdict is based on a machine learning analysis of the text's content and structure."
+
+
+def _unavailable_result(explanation: str) -> dict:
+    return {
+        "verdict": "Uncertain",
+        "confidence": 0,
+        "explanation": explanation,
+        "highlighted": []
+    }
+
+
+def _verdict_from_probabilities(probabilities) -> dict:
+    """Turns one row of `predict_proba` output into a verdict dict."""
+    # Same decision rule as model.predict(): the most probable class wins.
+    predicted_class_index = int(np.argmax(probabilities))
+    verdict = CLASS_LABELS[predicted_class_index]
+    confidence = int(probabilities[predicted_class_index] * 100)
+    return {
+        "verdict": verdict,
+        "confidence": confidence,
+        "explanation": ML_EXPLANATION,
+        "highlighted": []
+    }
+
+
+def _predict_proba(texts: List[str]):
+    """Single vectorize + booster pass, via the compiled scorer when it is available."""
+    with track_stage("tfidf"):
+        features = scorer.transform(texts) if scorer is not None else vectorizer.transform(texts)
+    with track_stage("xgboost"):
+        if scorer is not None:
+            return scorer.predict_matrix(features)
+        return model.predict_proba(features)
 
-    except Exception as e:
-        print(f"An error occurred during ML component loading: {e}")
-        print("The predict function will return a default 'Uncertain' value.")
-        model = None
-        vectorizer = None
 
-# --- 3. Prediction Function ---
 def predict(text: str) -> dict:
     """
-    Analyzes a given text using the pre-loaded TF-IDF vectorizer and ML model.
+    Analyzes a given text with the pre-loaded TF-IDF + XGBoost model.
+    """
+    if not load_components():
+        logger.error("Prediction failed: model or vectorizer not loaded.")
+        return _unavailable_result("Model components are not available. Could not perform analysis.")
+
+    try:
+        # The label and the confidence both come from this one probability vector.
+        probabilities = _predict_proba([text])[0]
+        result = _verdict_from_probabilities(probabilities)
+        logger.debug("Verdict: '%s' with %s%% confidence for text: '%.100s...'", result['verdict'], result['confidence'], text)
+        return result
+    except Exception as e:
+        logger.exception("Prediction failed: %s", e)
+        return _unavailable_result(f"An error occurred during analysis: {e}")
+
+
+def predict_batch(texts: List[str]) -> List[dict]:
+    """
+    Scores several texts with a single vectorize + predict_proba pass.
+    Returns one verdict dict per input text, in the same order.
     """
-    print("\n--- [PREDICTION START] ---")
-    if model is None or vectorizer is None:
-        print("[PREDICTION_ERROR] Model or vectorizer not loaded.")
-        return {
-            "verdict": "Uncertain",
-            "confidence": 0,
-            "explanation": "Model components are not available. Could not perform analysis.",
-            "highlighted": []
-        }
+    if not texts:
+        return []
+    if not load_components():
+        return [_unavailable_result("Model components are not available. Could not perform analysis.") for _ in texts]
 
     try:
-        print(f"Received text for analysis: '{text[:100]}...'")
-
-        # Step 1: Transform the input text
-        print("Step 1: Transforming text with TF-IDF vectorizer...")
-        text_vector = vectorizer.transform([text])
-        print(f"Vectorizer output shape: {text_vector.shape}")
-        # A shape of (1, 0) means the vocabulary was empty for this input.
-        if text_vector.shape[1] == 0:
-            print("[PREDICTION_WARNING] Vectorizer produced an empty vector. The model may not have any features to analyze.")
-            # This can happen if the input text contains only words not seen during training.
-
-        # Step 2: Get probability predictions
-        print("Step 2: Predicting probabilities with XGBoost model...")
-        probabilities = model.predict_proba(text_vector)[0]
-        print(model.predict(text_vector))
-        # print(f"Model output (probabilities): {probabilities}")
-
-        # Step 3: Determine verdict
-        # predicted_class_index = np.argmax(probabilities)
-        predicted_class_index = model.predict(text_vector)[0]
-        verdict = CLASS_LABELS[predicted_class_index]
-        print(f"Predicted class index: {predicted_class_index} ({verdict})")
-        # confidence = int(probabilities[predicted_class_index] * 100)
-        confidence = int(probabilities[predicted_class_index] * 100)
-        print(f"Verdict: '{verdict}' with {confidence}% confidence.")
-
-        print("--- [PREDICTION SUCCESS] ---\n")
-        return {
-            "verdict": verdict,
-            "confidence": confidence,
-            "explanation": "This verdict is based on a machine learning analysis of the text's content and structure.",
-            "highlighted": []
-        }
+        probabilities = _predict_proba(texts)
+        return [_verdict_from_probabilities(row) for row in probabilities]
     except Exception as e:
-        print(f"[PREDICTION_ERROR] An exception occurred: {e}")
-        import traceback
-        traceback.print_exc()
-        print("--- [PREDICTION FAILED] ---\n")
-        return {
-            "verdict": "Uncertain",
-            "confidence": 0,
-            "explanation": f"An error occurred during analysis: {e}",
-            "highlighted": []
-        }
\ No newline at end of file
+        logger.exception("Failed to score a batch of %d texts: %s", len(texts), e)
+        return [_unavailable_result(f"An error occurred during analysis: {e}") for _ in texts]
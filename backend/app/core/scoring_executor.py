@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from .config.settings import settings
+from .batching import MicroBatcher
+from .metrics import record_timeout, register_gauge, track_stage
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringQueueFull(RuntimeError):
+    """Raised when the scoring queue stays full for longer than the queue timeout."""
+
+
+def _init_worker():
+    """
+    Runs once in every pool worker and loads the model. Exported artifacts
+    are memory-mapped, so process workers share their pages; the pickle
+    fallback gives each worker its own copy.
+    """
+    from . import ml_model
+    if not ml_model.load_components():
+        logger.warning("[SCORING_WORKER %d] ML components are not available in this worker.", os.getpid())
+
+
+def _score_batch_in_worker(texts: List[str]) -> List[dict]:
+    from .ml_model import predict_batch
+    return predict_batch(texts)
+
+
+class ScoringExecutor:
+    """
+    Runs CPU-bound ML scoring in a pool of workers so it never blocks the event loop.
+
+    `kind` selects a thread pool (shares this process's loaded model) or a
+    process pool (each worker loads the model once at start and scores in
+    parallel across cores). At most `max_queue` jobs may be in flight; further
+    callers wait for a slot, up to `queue_timeout` seconds.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int, queue_timeout: float):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown scoring executor kind: {kind!r} (expected 'thread' or 'process')")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.queue_timeout = queue_timeout
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # "spawn" keeps workers clear of the parent's threads and open sockets.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="ml-scoring",
+                    initializer=_init_worker,
+                )
+            logger.info("ML scoring executor started: %d %s worker(s), queue bound %d.", self.workers, self.kind, self.max_queue)
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+        return self._slots
+
+    async def predict_batch_async(self, texts: List[str]) -> List[dict]:
+        """Scores a list of texts in a pool worker."""
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            record_timeout("ml_queue")
+            raise ScoringQueueFull(f"ML scoring queue is full ({self.max_queue} jobs in flight)")
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Pool wait + transfer + scoring; tfidf/xgboost are also recorded separately (thread workers only).
+            with track_stage("ml_scoring"):
+                return await loop.run_in_executor(self._get_pool(), _score_batch_in_worker, texts)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            slots.release()
+
+    async def predict_async(self, text: str) -> dict:
+        """Scores a single text in a pool worker."""
+        results = await self.predict_batch_async([text])
+        return results[0]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# Singletons shared by all requests in this uvicorn worker
+scoring_executor = ScoringExecutor(
+    kind=settings.ML_EXECUTOR_KIND,
+    workers=settings.ML_EXECUTOR_WORKERS,
+    max_queue=settings.ML_EXECUTOR_MAX_QUEUE,
+    queue_timeout=settings.ML_EXECUTOR_QUEUE_TIMEOUT_SECONDS,
+)
+
+register_gauge("ml_scoring_in_flight", "ML scoring jobs running or queued in the executor.", lambda: scoring_executor.in_flight)
+
+ml_batcher = MicroBatcher(
+    scoring_executor.predict_batch_async,
+    max_batch_size=settings.ML_BATCH_MAX_SIZE,
+    max_wait_ms=settings.ML_BATCH_MAX_WAIT_MS,
+)
+
+
+async def predict_async(text: str) -> dict:
+    """
+    Scores a text off the event loop. Concurrent calls are micro-batched
+    when ML_BATCH_ENABLED is set.
+    """
+    if settings.ML_BATCH_ENABLED:
+        return await ml_batcher.predict(text)
+    return await scoring_executor.predict_async(text)
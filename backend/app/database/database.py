@@ -1,6 +1,9 @@
+import logging
 import motor.motor_asyncio
 from ..core.config.settings import settings # <-- Import the central settings object
 
+logger = logging.getLogger(__name__)
+
 # --- Database Client ---
 # Use the validated and type-safe settings from the config file.
 client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_DETAILS)
@@ -9,7 +12,7 @@ database = client[settings.DATABASE_NAME]
 # --- Collections ---
 feedback_collection = database.get_collection("feedback")
 
-print(f"MongoDB {settings.MONGO_DETAILS} client initialized for database: '{settings.DATABASE_NAME}'")
+logger.info("MongoDB %s client initialized for database: '%s'", settings.MONGO_DETAILS, settings.DATABASE_NAME)
 async def add_feedback(feedback_data: dict):
     """Insert a feedback document and return its ID."""
     result = await feedback_collection.insert_one(feedback_data)
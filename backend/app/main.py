@@ -1,10 +1,28 @@
+import asyncio
+import logging
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from .core.logging_config import RequestContextMiddleware, setup_logging, shutdown_logging
+
+# Configured before the other app modules are imported, so their import-time messages go through it too.
+setup_logging()
+
 from .routes import analysis, feedback
 from .database.database import client
 from .core.config.settings import settings 
+from .core.scoring_executor import ml_batcher, scoring_executor
+from .core.components import warm_up, readiness
+from .core.metrics import render_metrics
+from .services.ocr_service import ocr_executor
+from .utils.helpers import close_http_clients
+from .services.pdf_store import pdf_parser, pdf_store
+from .services.http_transport import close_shared_client
+from .services.feedback_buffer import feedback_buffer
 from .routes import verification
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Analyzes content and cross-references with external sources.",
@@ -18,11 +36,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-# --- Event Handlers for DB Connection ---
+app.add_middleware(RequestContextMiddleware)
+# --- Event Handlers ---
+@app.on_event("startup")
+async def start_background_warmup():
+    # Heavy components load in worker threads after startup, so the worker
+    # accepts requests immediately. Anything not warmed yet loads on first use.
+    if settings.WARMUP_ON_STARTUP:
+        app.state.warmup_task = asyncio.create_task(warm_up(settings.WARMUP_COMPONENTS))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Buffered feedback goes out before the connection it needs is closed.
+    await feedback_buffer.close(settings.FEEDBACK_SHUTDOWN_FLUSH_SECONDS)
     client.close()
-    print("MongoDB connection closed.")
+    logger.info("MongoDB connection closed.")
+    await ml_batcher.close()
+    scoring_executor.shutdown()
+    ocr_executor.shutdown()
+    await close_http_clients()
+    await close_shared_client()
+    pdf_parser.shutdown()
+    await pdf_store.close()
+    shutdown_logging()
 
 # --- API Routers ---
 app.include_router(analysis.router, prefix=settings.API_V1_STR, tags=["Analysis"])
@@ -33,4 +69,28 @@ app.include_router(verification.router, prefix=settings.API_V1_STR, tags=["Verif
 
 @app.get("/", tags=["Root"])
 async def read_root():
-    return {"message": f"Welcome to the {settings.PROJECT_NAME}. Visit /docs for documentation."}
\ No newline at end of file
+    return {"message": f"Welcome to the {settings.PROJECT_NAME}. Visit /docs for documentation."}
+
+# --- Readiness and Warm-up ---
+
+@app.get("/ready", tags=["Root"])
+async def ready():
+    """Reports the load state of each component; 503 until the required ones are ready."""
+    states = readiness()
+    is_ready = all(states.get(name, {}).get("state") == "ready" for name in settings.READY_REQUIRED_COMPONENTS)
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "required": settings.READY_REQUIRED_COMPONENTS, "components": states},
+    )
+
+@app.post("/warmup", tags=["Root"])
+async def warmup(retry_failed: bool = True):
+    """Loads every component now (retrying failed ones by default) and reports their state."""
+    return {"components": await warm_up(retry_failed=retry_failed)}
+
+# --- Metrics ---
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+async def metrics():
+    """Per-stage latency histograms, error/timeout counters and cache hit ratios (Prometheus text format)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -22,7 +22,7 @@ class FactCheckData(BaseModel):
 class SourceResult(BaseModel):
     """Defines the structured output for a single external source."""
     source_name: str = Field(description="The name of the external API source (e.g., 'X (Twitter)', 'Gov Fact Check').")
-    status: str = Field(description="The status of the operation for this source (e.g., 'SUCCESS', 'ERROR').")
+    status: str = Field(description="The status of the operation for this source (e.g., 'SUCCESS', 'ERROR', 'TIMEOUT', or 'SKIPPED' when the text gave nothing to search for).")
     data: List[Union[SocialMediaPost, FactCheckData, Dict[str, Any]]] = Field(
         description="A list of data items retrieved from the source."
     )
@@ -37,17 +37,43 @@ class AnalysisVerdict(BaseModel):
     explanation: str = Field(description="Short explanation of the reasoning.")
     highlighted: List[str] = Field(description="List of suspicious keywords/phrases.")
 
+class CacheInfo(BaseModel):
+    """Verdict cache outcome for a single response, plus running totals for this worker."""
+    status: str = Field(description="'HIT', 'MISS', 'COALESCED' (shared an identical in-flight analysis) or 'BYPASS'.")
+    tier: Optional[str] = Field(None, description="Which tier served a hit: 'memory' or 'shared'.")
+    hits: int = Field(0, description="Cache hits served by this worker so far.")
+    misses: int = Field(0, description="Cache misses seen by this worker so far.")
+
+class BudgetReport(BaseModel):
+    """How the external fan-out fared against its latency budgets."""
+    deadline_ms: int = Field(description="Overall deadline for the analysis.")
+    elapsed_ms: int = Field(description="Time the pipeline actually took.")
+    sources: Dict[str, str] = Field(description="Outcome per source: 'OK', 'ERROR', 'TIMEOUT', 'CANCELLED' or 'SKIPPED'.")
+    timed_out: List[str] = Field(default=[], description="Sources that missed their budget or the deadline.")
+
+class TranscriptInfo(BaseModel):
+    """How much of a voice recording was transcribed and analyzed."""
+    words: int = Field(description="Words in the transcript that was analyzed.")
+    transcribed_seconds: float = Field(description="Seconds of audio transcribed.")
+    truncated: bool = Field(description="Transcription stopped at VOICE_ANALYSIS_MIN_WORDS; later audio was not analyzed.")
+
 class FinalAnalysisResponse(BaseModel):
     """Defines the final, aggregated response structure for the API."""
     analysis: AnalysisVerdict = Field(description="The core verdict from our ML model.")
     related_sources: List[SourceResult] = Field(default=[], description="Results from external sources supporting or contradicting the claim.")
     extracted_text: str = Field(description="The primary text used for backend analysis (from body, URL, or OCR).")
+    cache: Optional[CacheInfo] = Field(None, description="Whether this response was served from the verdict cache.")
+    budget: Optional[BudgetReport] = Field(None, description="Latency budget outcome of the external lookups.")
+    transcript: Optional[TranscriptInfo] = Field(None, description="For voice input: how much of the recording was analyzed.")
 
 # --- Models for Request Inputs ---
 
 class TextIn(BaseModel):
     text: str
 
+class BatchAnalysisIn(BaseModel):
+    texts: List[str] = Field(..., description="Texts to analyze; results are tagged with their index in this list.")
+
 class UrlIn(BaseModel):
     url: HttpUrl
 
@@ -64,16 +90,18 @@ class FeedbackOut(BaseModel):
             ObjectId: str
         }
 
-try:
-    import pytesseract
-except ModuleNotFoundError:
-    pytesseract = None
-    # later, when you attempt OCR, check and raise a helpful error if None
-
 class VerificationQueryIn(BaseModel):
     """Input model for a query to be verified against official PDFs."""
     query: str = Field(..., min_length=10, description="The claim or question to verify.")
 
+class VerificationExcerpt(BaseModel):
+    """One passage from an official document that matches the query."""
+    source: str
+    url: str
+    page: int
+    excerpt: str
+    score: float = Field(..., description="BM25 relevance score.")
+
 class VerificationResponseOut(BaseModel):
     """Output model for the PDF verification result."""
     query: str
@@ -82,4 +110,5 @@ class VerificationResponseOut(BaseModel):
     page: Optional[int] = None
     excerpt: Optional[str] = None
     summary: str
-    suggested_sources: List[str] = []
\ No newline at end of file
+    suggested_sources: List[str] = []
+    excerpts: List[VerificationExcerpt] = Field(default_factory=list, description="Top-scoring passages, best first.")
\ No newline at end of file
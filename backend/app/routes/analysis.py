@@ -1,11 +1,37 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from ..models.models import TextIn, UrlIn, FinalAnalysisResponse
+import asyncio
+import json
+import logging
+import shutil
+import tempfile
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from ..models.models import TextIn, UrlIn, FinalAnalysisResponse, BatchAnalysisIn
+from ..core.config.settings import settings
 from ..services.analysis_service import (
     analyze_text_service,
     analyze_url_service,
     analyze_image_service,
     analyze_voice_service,
+    analyze_batch_service,
+    stream_analysis_events,
+    stream_url_analysis,
+    stream_image_analysis,
+    stream_voice_analysis,
+    tier_counters,
+    analysis_flights,
 )
+from ..core.scoring_executor import ml_batcher, scoring_executor
+from ..services.verdict_cache import verdict_cache
+from ..services.ocr_service import ocr_executor
+from ..services.image_hash_cache import image_hash_cache
+from ..utils.article_cache import article_cache
+from ..services.external_apis import x_service, reddit_service
+from ..services.social_query import social_result_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -16,13 +42,13 @@ async def analyze_text(request: TextIn):
         if not request.text or not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
             
-        print(f"Analyzing text: {request.text[:100]}...")
+        logger.debug("Analyzing text: %.100s...", request.text)
         result = await analyze_text_service(request.text)
         
         if not result:
             raise HTTPException(status_code=500, detail="Analysis failed - no result returned")
             
-        print(f"Analysis complete. Verdict: {result.get('analysis', {}).get('verdict')}")
+        logger.debug("Analysis complete. Verdict: %s", result.get('analysis', {}).get('verdict'))
         return {
             "analysis": result.get("analysis", {
                 "verdict": "Unknown",
@@ -30,11 +56,13 @@ async def analyze_text(request: TextIn):
                 "explanation": "Analysis failed to return a valid result"
             }),
             "related_sources": result.get("related_sources", []),
-            "extracted_text": result.get("extracted_text", request.text)
+            "extracted_text": result.get("extracted_text", request.text),
+            "cache": result.get("cache"),
+            "budget": result.get("budget")
         }
         
     except Exception as e:
-        print(f"Error in analyze_text: {str(e)}")
+        logger.exception("Error in analyze_text: %s", e)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @router.post("/analyze-url", response_model=FinalAnalysisResponse)
@@ -45,11 +73,19 @@ async def analyze_url(request: UrlIn):
         raise HTTPException(status_code=400, detail="Could not fetch or process the article from the URL.")
     return result
 
+async def _read_images(file: Optional[UploadFile], files: Optional[List[UploadFile]]) -> List[bytes]:
+    uploads = ([file] if file is not None else []) + (files or [])
+    if not uploads:
+        raise HTTPException(status_code=400, detail="Upload at least one image as 'file' or 'files'.")
+    if len(uploads) > settings.OCR_MAX_IMAGES_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {settings.OCR_MAX_IMAGES_PER_REQUEST} images per request.")
+    return [await upload.read() for upload in uploads]
+
 @router.post("/analyze-image", response_model=FinalAnalysisResponse)
-async def analyze_image(file: UploadFile = File(...)):
-    """Extract text from an image via OCR and analyze it."""
-    contents = await file.read()
-    result = await analyze_image_service(contents)
+async def analyze_image(file: Optional[UploadFile] = File(None), files: Optional[List[UploadFile]] = File(None)):
+    """Extract text from one or more images via OCR and analyze it."""
+    images = await _read_images(file, files)
+    result = await analyze_image_service(images)
     if not result:
         raise HTTPException(status_code=400, detail="Could not extract readable text from the image.")
     return result
@@ -57,12 +93,215 @@ async def analyze_image(file: UploadFile = File(...)):
 @router.post("/analyze-voice", response_model=FinalAnalysisResponse)
 async def analyze_voice(file: UploadFile = File(...)):
     """Transcribe a voice file and analyze the text."""
-    # Saving file temporarily to disk for SpeechRecognition library
-    file_path = f"/tmp/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    
-    result = await analyze_voice_service(file_path)
+    # The upload is already spooled (memory, then an anonymous temp file), so
+    # decode straight from it instead of writing our own copy to /tmp.
+    result = await analyze_voice_service(file.file)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    return result
\ No newline at end of file
+    return result
+
+VOICE_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Wraps (event, payload) pairs as Server-Sent Events. The ML verdict comes
+    first ("ml"), then "source" and "llm" events as they finish, then "final"
+    with the aggregated FinalAnalysisResponse. Failures are sent as "error".
+    """
+    async def event_stream():
+        try:
+            async for event, payload in events:
+                if event == "final":
+                    payload = FinalAnalysisResponse.model_validate(payload)
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+        except Exception as e:
+            # The status line is long gone, so the failure is reported in-band before the stream closes.
+            logger.error("Streaming analysis failed: %s", e)
+            yield f"event: error\ndata: {json.dumps({'detail': f'Analysis failed: {e}'})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/analysis/stream")
+async def analyze_text_stream(request: TextIn):
+    """Analyze a raw block of text, streaming results as Server-Sent Events."""
+    if not request.text or not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    return _sse_response(stream_analysis_events(request.text))
+
+@router.post("/analyze-url/stream")
+async def analyze_url_stream(request: UrlIn):
+    """Scrape and analyze an article from a URL, streaming results as Server-Sent Events."""
+    return _sse_response(stream_url_analysis(str(request.url)))
+
+@router.post("/analyze-image/stream")
+async def analyze_image_stream(file: Optional[UploadFile] = File(None), files: Optional[List[UploadFile]] = File(None)):
+    """OCR one or more images and analyze them, streaming results as Server-Sent Events."""
+    images = await _read_images(file, files)
+    return _sse_response(stream_image_analysis(images))
+
+@router.post("/analyze-voice/stream")
+async def analyze_voice_stream(file: UploadFile = File(...)):
+    """Transcribe a voice file and analyze it, streaming results as Server-Sent Events."""
+    # The upload is closed once this handler returns, so keep our own spooled copy for the stream.
+    audio = tempfile.SpooledTemporaryFile(max_size=VOICE_SPOOL_MAX_MEMORY)
+    await asyncio.to_thread(shutil.copyfileobj, file.file, audio)
+    audio.seek(0)
+
+    async def events():
+        try:
+            async for event in stream_voice_analysis(audio):
+                yield event
+        finally:
+            audio.close()
+
+    return _sse_response(events())
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+UPLOAD_READ_SIZE = 64 * 1024
+BATCH_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+def _parse_ndjson_line(line: bytes) -> Optional[str]:
+    """Each line is either a JSON string or an object with a "text" field."""
+    try:
+        value = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict) and isinstance(value.get("text"), str):
+        return value["text"]
+    return None
+
+
+async def _iter_ndjson_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    index = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        yield index, _parse_ndjson_line(line)
+        index += 1
+
+
+async def _iter_upload_chunks(upload: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(UPLOAD_READ_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _spool_body(request: Request):
+    """
+    Reads the whole request body into a spooled temporary file before any
+    results are sent. Most clients upload the full body before reading the
+    response, so reading it lazily while streaming results back would
+    deadlock once the response fills the connection's buffers.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_MEMORY)
+    try:
+        async for chunk in request.stream():
+            await asyncio.to_thread(spool.write, chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+async def _iter_spool_chunks(spool) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(spool.read, UPLOAD_READ_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _iter_list_items(texts: List[str]) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    for index, text in enumerate(texts):
+        yield index, text
+
+
+@router.post("/analysis/batch")
+async def analyze_batch(
+    request: Request,
+    full_analysis: bool = Query(False, description="Also run the LLM cascade and social lookups for every item."),
+    concurrency: int = Query(8, ge=1, le=settings.BATCH_MAX_CONCURRENCY, description="Items analyzed at once when full_analysis is set."),
+):
+    """
+    Analyze many texts in one request.
+
+    The body may be a JSON object `{"texts": [...]}` (or a bare JSON list), an
+    NDJSON body (`application/x-ndjson`), or a multipart upload with an NDJSON
+    `file`. NDJSON lines are JSON strings or objects with a "text" field.
+    Results stream back as NDJSON in completion order, each tagged with the
+    `index` of its input.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    form = None
+    spool = None
+    if content_type in NDJSON_MEDIA_TYPES:
+        spool = await _spool_body(request)
+        items = _iter_ndjson_items(_iter_spool_chunks(spool))
+    elif content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            await form.close()
+            raise HTTPException(status_code=400, detail="Multipart batch uploads need an NDJSON 'file' field.")
+        items = _iter_ndjson_items(_iter_upload_chunks(upload))
+    else:
+        try:
+            payload = json.loads(await request.body())
+            if isinstance(payload, list):
+                payload = {"texts": payload}
+            batch = BatchAnalysisIn.model_validate(payload)
+        except ValueError as e:
+            # ValidationError is a ValueError too
+            detail = e.errors() if isinstance(e, ValidationError) else f"Invalid JSON body: {e}"
+            raise HTTPException(status_code=422, detail=detail)
+        items = _iter_list_items(batch.texts)
+
+    async def ndjson_results():
+        try:
+            async for result in analyze_batch_service(items, full_analysis=full_analysis, concurrency=concurrency):
+                yield json.dumps(jsonable_encoder(result)) + "\n"
+        finally:
+            if form is not None:
+                await form.close()
+            if spool is not None:
+                spool.close()
+
+    return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
+
+@router.get("/analysis/stats")
+async def analysis_stats():
+    """Runtime statistics for the analysis pipeline."""
+    return {
+        "ml_batching": ml_batcher.stats(),
+        "ml_executor": scoring_executor.stats(),
+        "verdict_cache": verdict_cache.stats(),
+        "cascade": dict(tier_counters),
+        "single_flight": analysis_flights.stats(),
+        "ocr_executor": ocr_executor.stats(),
+        "image_hash_cache": image_hash_cache.stats(),
+        "article_cache": article_cache.stats(),
+        "external_apis": {service.api_name: service.stats() for service in (x_service, reddit_service)},
+        "social_result_cache": social_result_cache.stats(),
+    }
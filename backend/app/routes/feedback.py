@@ -1,11 +1,22 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
 from ..models.models import FeedbackIn, FeedbackOut
+from ..services.feedback_buffer import FeedbackBufferFull
 from ..services.feedback_services import save_feedback_service
 
 router = APIRouter()
 
+# Seconds clients are asked to wait when the feedback buffer is full.
+FEEDBACK_RETRY_AFTER = "1"
+
 @router.post("/feedback", response_model=FeedbackOut, status_code=status.HTTP_201_CREATED)
 async def receive_feedback(request: FeedbackIn):
     """Accepts a user rating (1-5) and stores it."""
-    new_feedback = await save_feedback_service(request)
-    return new_feedback
\ No newline at end of file
+    try:
+        new_feedback = await save_feedback_service(request)
+    except FeedbackBufferFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too much feedback is waiting to be stored. Please retry shortly.",
+            headers={"Retry-After": FEEDBACK_RETRY_AFTER},
+        )
+    return new_feedback
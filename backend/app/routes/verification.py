@@ -1,7 +1,10 @@
+import logging
 from fastapi import APIRouter, HTTPException
 from ..models.models import VerificationQueryIn, VerificationResponseOut
 from ..services.verification_services import verify_query_against_pdfs
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post(
@@ -25,5 +28,5 @@ async def verify_claim_endpoint(request: VerificationQueryIn):
         return result
     except Exception as e:
         # This catches any unexpected errors during the process
-        print(f"An unexpected error occurred in the verification endpoint: {e}")
+        logger.exception("An unexpected error occurred in the verification endpoint: %s", e)
         raise HTTPException(status_code=500, detail="An internal error occurred during the verification process.")
\ No newline at end of file
@@ -1,110 +1,174 @@
 import asyncio
-try:
-    import pytesseract
-except Exception:
-    pytesseract = None
-from PIL import Image
-import io
-from ..utils.helpers import fetch_article_text_from_url
+import copy
+import logging
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from ..utils.helpers import fetch_article_text_from_url, content_key
 from .external_apis import x_service, reddit_service
 from .gemini_service import analyze_credibility
-from ..core.ml_model import predict
-import pytesseract
-
-
-# Whisper import
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except Exception as e:
-    print(f"Whisper import error: {e}")
-    whisper = None
-    WHISPER_AVAILABLE = False
-
-# Initialize whisper model globally
-whisper_model = None
-if WHISPER_AVAILABLE:
-    try:
-        print("Loading Whisper model...")
-        whisper_model = whisper.load_model("base")
-        print("Whisper model loaded successfully.")
-    except Exception as e:
-        print(f"Could not load Whisper model: {e}")
-else:
-    print("Whisper is not available. Voice analysis will be disabled.")
+from .transcription_service import iter_transcript_async, transcribe
+from .ocr_service import extract_text_from_images
+from ..core.scoring_executor import predict_async, scoring_executor
+from ..core.config.settings import settings
+from ..core.metrics import record_timeout, track_stage
+from .verdict_cache import verdict_cache
+from ..models.models import SourceResult
 
+logger = logging.getLogger(__name__)
 
-async def _get_combined_analysis(text: str):
+LLM_SOURCE_NAME = "OpenAI"
+
+# How often each tier decided the verdict, and what happened to LLM calls.
+tier_counters = {
+    "decided_by_ml": 0,
+    "decided_by_llm": 0,
+    "decided_by_error": 0,
+    "llm_called": 0,
+    "llm_skipped": 0,
+    "llm_cancelled": 0,
+}
+
+
+def _ml_is_confident(ml_result, text: str) -> bool:
+    """True when the ML verdict is trustworthy enough to skip the LLM."""
+    if not ml_result or ml_result.get("verdict") == "Uncertain":
+        return False
+    if len(text.split()) < settings.CASCADE_MIN_WORDS:
+        return False
+    return ml_result.get("confidence", 0) >= settings.CASCADE_CONFIDENCE_THRESHOLD
+
+
+async def _iter_combined_analysis(text: str) -> AsyncIterator[Tuple[str, Any]]:
     """
-    Full analysis pipeline:
-    - Run ML model for initial verdict
-    - Fallback to Gemini AI if ML is low confidence / uncertain
-    - Aggregate social media results
+    Full analysis pipeline, yielding (event, payload) pairs as each stage finishes:
+    - "ml":     the ML model verdict (available within milliseconds)
+    - "source": each SourceResult from the social media lookups
+    - "llm":    the LLM (Gemini/OpenAI) verdict, when the LLM was consulted
+    - "final":  the aggregated response, always the last event
+
+    The LLM is consulted according to ANALYSIS_LLM_MODE:
+        "always":      always call the LLM and prefer its verdict
+        "cascade":     only call the LLM when the ML verdict is uncertain
+        "speculative": start the LLM at once, cancel it if the ML verdict is confident
     """
-    try:
-        print(f"Starting analysis for text: {text[:100]}...")
+    mode = settings.ANALYSIS_LLM_MODE
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + settings.ANALYSIS_DEADLINE_SECONDS
+    social_tasks = []
+    llm_task = None
+    # Per-task (source name, deadline) and the budget outcome of every source.
+    task_budgets: Dict[asyncio.Future, Tuple[str, float]] = {}
+    source_status = {LLM_SOURCE_NAME: "SKIPPED", x_service.api_name: "SKIPPED", reddit_service.api_name: "SKIPPED"}
+    source_stages = {LLM_SOURCE_NAME: "openai", x_service.api_name: x_service.stage, reddit_service.api_name: reddit_service.stage}
 
-        ml_result = None
-        final_verdict = None
-        gemini_needed = True
+    def start_task(coro, source_name: str, budget_seconds: float) -> asyncio.Future:
+        task = asyncio.ensure_future(coro)
+        task_budgets[task] = (source_name, min(loop.time() + budget_seconds, deadline))
+        source_status[source_name] = "PENDING"
+        return task
 
-        # Step 1: Run ML model
+    # Timed by hand: the stage spans the yields below, up to the "final" event.
+    analysis_stage = track_stage("analysis").__enter__()
+    try:
+        logger.debug("Starting analysis for text: %.100s... (LLM mode: %s)", text, mode)
+
+        # Step 1: Social media lookups don't depend on the verdict, start them right away.
         try:
-            ml_result = predict(text)
-            print(f"ML Model verdict: {ml_result.get('verdict')} | confidence: {ml_result.get('confidence')}%")
-            # Use ML only if confident
-            is_short_text = len(text.split()) < 20 
-            if is_short_text:
-                print("Text is too short. Forcing Gemini AI analysis for higher accuracy.")
-                gemini_needed = True
-            # Only rely on the ML model if it's highly confident AND the text is long enough
-            elif ml_result.get("confidence", 0) >= 80 and ml_result.get("verdict") != "Uncertain":
-                gemini_needed = False
-            if ml_result.get("confidence", 0) >= 80 and ml_result.get("verdict") != "Uncertain":
-                gemini_needed = False
+            social_tasks = [
+                start_task(x_service.search_posts(text), x_service.api_name, settings.X_BUDGET_SECONDS),
+                start_task(reddit_service.search_posts(text), reddit_service.api_name, settings.REDDIT_BUDGET_SECONDS),
+            ]
         except Exception as e:
-            print(f"ML prediction failed: {e}")
+            logger.error("Error preparing external API tasks: %s", e)
+
+        if mode in ("always", "speculative"):
+            llm_task = start_task(analyze_credibility(text), LLM_SOURCE_NAME, settings.OPENAI_BUDGET_SECONDS)
+            tier_counters["llm_called"] += 1
 
-        # Step 2: Prepare external tasks (social media + Gemini)
-        tasks = []
+        # Step 2: Run ML model
+        ml_result = None
         try:
-            tasks.append(analyze_credibility(text))  # Gemini fallback
-            tasks.extend([
-                x_service.search_posts(text),
-                reddit_service.search_posts(text)
-            ])
+            ml_result = await asyncio.wait_for(predict_async(text), timeout=max(0.0, deadline - loop.time()))
+            logger.debug("ML Model verdict: %s | confidence: %s%%", ml_result.get('verdict'), ml_result.get('confidence'))
+        except asyncio.TimeoutError:
+            record_timeout("ml")
+            logger.warning("ML prediction did not finish within the analysis deadline.")
         except Exception as e:
-            print(f"Error preparing external API tasks: {e}")
-
-        # Step 3: Run all tasks concurrently
-        external_results = []
-        if tasks:
-            try:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                external_results = [r for r in results if not isinstance(r, Exception)]
-            except Exception as e:
-                print(f"Error running external API tasks: {e}")
-
-        # Step 4: Process results safely
-        social_results = []
+            logger.error("ML prediction failed: %s", e)
+        ml_confident = _ml_is_confident(ml_result, text)
+        if ml_result:
+            yield "ml", {**ml_result, "source": "ML Model"}
+
+        # Step 3: Decide whether the LLM is needed
+        if mode == "speculative" and ml_confident:
+            llm_task.cancel()
+            source_status[LLM_SOURCE_NAME] = "CANCELLED"
+            llm_task = None
+            tier_counters["llm_cancelled"] += 1
+            logger.debug("ML verdict is confident. Cancelled the speculative LLM call.")
+        elif mode not in ("always", "speculative"):
+            if ml_confident:
+                tier_counters["llm_skipped"] += 1
+                logger.debug("ML verdict is confident. Skipping the LLM.")
+            else:
+                llm_task = start_task(analyze_credibility(text), LLM_SOURCE_NAME, settings.OPENAI_BUDGET_SECONDS)
+                tier_counters["llm_called"] += 1
+
+        # Step 4: Collect the remaining tasks as they complete, within their budgets
         gemini_result = {}
+        social_results = []
+        pending = set(social_tasks)
+        if llm_task is not None:
+            pending.add(llm_task)
+        while pending:
+            next_deadline = min(task_budgets[task][1] for task in pending)
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, next_deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                source_name = task_budgets[task][0]
+                if task.cancelled():
+                    source_status[source_name] = "CANCELLED"
+                    continue
+                error = task.exception()
+                source_status[source_name] = "ERROR" if error is not None else "OK"
+                if task is llm_task:
+                    if error is not None:
+                        logger.error("LLM analysis failed: %s", error)
+                    elif isinstance(task.result(), dict) and "verdict" in task.result():
+                        gemini_result = task.result()
+                        yield "llm", gemini_result
+                elif error is None:
+                    result = task.result()
+                    if getattr(result, "status", None) in ("ERROR", "SKIPPED"):
+                        source_status[source_name] = result.status
+                    social_results.append(result)
+                    yield "source", result
 
-         # Gemini result is always the first task
-        if external_results and "verdict" in external_results[0]:
-            gemini_result = external_results[0]
-            
-            # Set gemini_needed to True if we have a valid result from Gemini
-            gemini_needed = True 
-        else:
-            # Gemini failed or returned an error, so we cannot use it.
-            gemini_needed = False
-            print("Gemini analysis failed or returned no verdict. Falling back to ML model if available.")
+            # Anything past its budget is cancelled and reported as a timeout.
+            now = loop.time()
+            for task in [t for t in pending if task_budgets[t][1] <= now]:
+                pending.discard(task)
+                task.cancel()
+                source_name = task_budgets[task][0]
+                source_status[source_name] = "TIMEOUT"
+                record_timeout(source_stages[source_name])
+                logger.warning("%s did not respond within its latency budget.", source_name)
+                if task is not llm_task:
+                    timeout_result = SourceResult(
+                        source_name=source_name,
+                        status="TIMEOUT",
+                        data=[],
+                        error_message=f"{source_name} did not respond within its latency budget.",
+                    )
+                    social_results.append(timeout_result)
+                    yield "source", timeout_result
 
-        social_results = external_results[1:] if len(external_results) > 1 else []
+        if llm_task is not None and not gemini_result:
+            logger.info("Gemini analysis failed or returned no verdict. Falling back to ML model if available.")
 
-        # --- Step 5: Decide final verdict (REVISED LOGIC) ---
-        # Prioritize a valid Gemini result.
-        if gemini_needed and gemini_result.get("verdict") != "Unknown":
+        # Step 5: Decide final verdict. A valid LLM verdict wins; otherwise use the ML model.
+        if gemini_result and gemini_result.get("verdict") != "Unknown":
             final_verdict = {
                 "verdict": gemini_result.get("verdict"),
                 "confidence": gemini_result.get("confidence", 0),
@@ -113,7 +177,7 @@ async def _get_combined_analysis(text: str):
                 "key_indicators": gemini_result.get("key_indicators", []),
                 "source": "Gemini AI"
             }
-        # Fallback to the ML Model result if Gemini was not needed or failed.
+            tier_counters["decided_by_llm"] += 1
         elif ml_result:
             final_verdict = {
                 **ml_result,
@@ -121,26 +185,35 @@ async def _get_combined_analysis(text: str):
                 "key_indicators": ml_result.get("key_indicators", []),
                 "source": "ML Model"
             }
-        # Final fallback if everything fails.
+            tier_counters["decided_by_ml"] += 1
         else:
             final_verdict = {
                 "verdict": "Error", "confidence": 0,
                 "explanation": "Both ML and AI analysis failed.",
                 "source": "Error"
             }
+            tier_counters["decided_by_error"] += 1
 
-        print(f"Final verdict: {final_verdict['verdict']} | source: {final_verdict['source']}")
+        logger.info("Final verdict: %s | source: %s", final_verdict['verdict'], final_verdict['source'])
 
         # Step 6: Return structured response
-        return {
+        final = {
             "analysis": final_verdict,
-            "related_sources": social_results or [],
-            "extracted_text": text
+            "related_sources": social_results,
+            "extracted_text": text,
+            "budget": {
+                "deadline_ms": int(settings.ANALYSIS_DEADLINE_SECONDS * 1000),
+                "elapsed_ms": int((loop.time() - started) * 1000),
+                "sources": source_status,
+                "timed_out": [name for name, status in source_status.items() if status == "TIMEOUT"],
+            },
         }
 
     except Exception as e:
-        print(f"Analysis pipeline error: {e}")
-        return {
+        logger.exception("Analysis pipeline error: %s", e)
+        analysis_stage.error()
+        tier_counters["decided_by_error"] += 1
+        final = {
             "analysis": {
                 "verdict": "Error",
                 "confidence": 0,
@@ -152,61 +225,334 @@ async def _get_combined_analysis(text: str):
             "related_sources": [],
             "extracted_text": text
         }
+    finally:
+        # Don't leave upstream calls running if we bailed out early or the consumer went away.
+        for task in [llm_task, *social_tasks]:
+            if task is not None and not task.done():
+                task.cancel()
+        analysis_stage.__exit__(None, None, None)
+
+    yield "final", final
+
+
+async def _get_combined_analysis(text: str):
+    """Runs the full pipeline and returns only the aggregated response."""
+    final = None
+    async for event, payload in _iter_combined_analysis(text):
+        if event == "final":
+            final = payload
+    return final
+
+
+class SingleFlight:
+    """
+    Runs at most one pipeline per key at a time. Concurrent callers with the
+    same key await the same task instead of starting their own.
+
+    The shared work runs as its own task and callers wait on it through
+    asyncio.shield, so a client that disconnects only cancels its own wait.
+    Errors raised by the shared work are re-raised to every waiting caller.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every caller went away.
+        if not task.cancelled():
+            task.exception()
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[asyncio.Task, bool]:
+        """Returns (task, shared): the task in flight for `key`, started with fn() if there was none."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return task, shared
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, shared); `shared` is True when another caller started the work."""
+        task, shared = self.start(key, fn)
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.followers}
+
+
+analysis_flights = SingleFlight()
+
+
+def _is_cacheable(result: dict) -> bool:
+    """Errors and partial (timed-out) results are not worth repeating to later callers."""
+    if result.get("analysis", {}).get("verdict") == "Error":
+        return False
+    return not (result.get("budget") or {}).get("timed_out")
+
+
+async def _analyze_and_store(key: str, text: str):
+    result = await _get_combined_analysis(text)
+    if settings.VERDICT_CACHE_ENABLED and _is_cacheable(result):
+        await verdict_cache.set(key, result)
+    return result
+
+
+async def _stream_and_store(key: str, text: str, events: asyncio.Queue):
+    """Like _analyze_and_store, but hands every event before "final" to `events`, then None."""
+    try:
+        result = None
+        async for event, payload in _iter_combined_analysis(text):
+            if event == "final":
+                result = payload
+            else:
+                events.put_nowait((event, payload))
+        if settings.VERDICT_CACHE_ENABLED and _is_cacheable(result):
+            await verdict_cache.set(key, result)
+        return result
+    finally:
+        events.put_nowait(None)
+
+
+async def _get_cached_analysis(text: str):
+    """
+    Serves repeated claims from the verdict cache and coalesces identical
+    in-flight requests, running the full pipeline at most once per claim.
+    """
+    key = content_key(text)
+    if settings.VERDICT_CACHE_ENABLED:
+        cached, tier = await verdict_cache.get(key)
+        if cached is not None:
+            # The key ignores case/punctuation/whitespace, so echo back this request's own text.
+            cached["extracted_text"] = text
+            cached["cache"] = verdict_cache.info("HIT", tier)
+            return cached
+
+    shared_result, shared = await analysis_flights.run(key, lambda: _analyze_and_store(key, text))
+    # Every caller gets its own copy of the shared result.
+    result = copy.deepcopy(shared_result)
+    result["extracted_text"] = text
+    if not settings.VERDICT_CACHE_ENABLED:
+        status = "BYPASS"
+    else:
+        status = "COALESCED" if shared else "MISS"
+    result["cache"] = verdict_cache.info(status)
+    return result
 
 
 # --- Service Wrappers ---
 async def analyze_text_service(text: str):
-    return await _get_combined_analysis(text)
+    return await _get_cached_analysis(text)
+
+
+async def _bounded_as_completed(
+    items: AsyncIterator[Any],
+    worker: Callable[[Any], Awaitable[List[dict]]],
+    limit: int,
+) -> AsyncIterator[dict]:
+    """
+    Pulls items lazily and keeps at most `limit` workers running, yielding
+    their results in completion order. Only `limit` items are ever held in memory.
+    """
+    pending = set()
+    exhausted = False
+    iterator = items.__aiter__()
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(worker(item)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for result in task.result():
+                    yield result
+    finally:
+        # The client went away (or we finished): stop any outstanding work.
+        for task in pending:
+            task.cancel()
+
+
+async def _chunked(items: AsyncIterator[Tuple[int, Optional[str]]], size: int) -> AsyncIterator[List[Tuple[int, Optional[str]]]]:
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _invalid_item(index: int) -> dict:
+    return {"index": index, "error": "Item must be a non-empty text."}
+
+
+async def _score_ml_chunk(chunk: List[Tuple[int, Optional[str]]]) -> List[dict]:
+    """Scores one chunk with a single vectorize + predict_proba pass."""
+    valid = [(index, text) for index, text in chunk if text and text.strip()]
+    results = [_invalid_item(index) for index, text in chunk if not (text and text.strip())]
+    if valid:
+        try:
+            verdicts = await scoring_executor.predict_batch_async([text for _, text in valid])
+            results.extend(
+                {"index": index, "analysis": {**verdict, "source": "ML Model"}}
+                for (index, _), verdict in zip(valid, verdicts)
+            )
+        except Exception as e:
+            results.extend({"index": index, "error": f"ML scoring failed: {e}"} for index, _ in valid)
+    return results
+
+
+async def _analyze_one(item: Tuple[int, Optional[str]]) -> List[dict]:
+    """Runs the full pipeline (cache, LLM cascade, social lookups) for one item."""
+    index, text = item
+    if not (text and text.strip()):
+        return [_invalid_item(index)]
+    try:
+        result = await _get_cached_analysis(text)
+        return [{
+            "index": index,
+            "analysis": result.get("analysis"),
+            "related_sources": result.get("related_sources", []),
+            "cache": result.get("cache"),
+        }]
+    except Exception as e:
+        return [{"index": index, "error": f"Analysis failed: {e}"}]
+
+
+async def analyze_batch_service(
+    items: AsyncIterator[Tuple[int, Optional[str]]],
+    full_analysis: bool = False,
+    concurrency: int = 8,
+) -> AsyncIterator[dict]:
+    """
+    Analyzes a stream of (index, text) items, yielding one result dict per
+    item in completion order.
+
+    By default only the ML model runs, on chunks of BATCH_ML_CHUNK_SIZE texts.
+    With `full_analysis`, every item goes through the full pipeline with at
+    most `concurrency` items in flight.
+    """
+    if full_analysis:
+        results = _bounded_as_completed(items, _analyze_one, concurrency)
+    else:
+        chunks = _chunked(items, settings.BATCH_ML_CHUNK_SIZE)
+        results = _bounded_as_completed(chunks, _score_ml_chunk, max(1, settings.ML_EXECUTOR_WORKERS))
+    async for result in results:
+        yield result
+
+
+async def stream_analysis_events(text: str) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming counterpart of _get_cached_analysis: yields the pipeline's
+    events as they happen. The run is registered with analysis_flights, so
+    it is shared with identical requests, streaming or not. A cache hit, or
+    joining a run another request started, yields only the "final" event.
+    """
+    key = content_key(text)
+    if settings.VERDICT_CACHE_ENABLED:
+        cached, tier = await verdict_cache.get(key)
+        if cached is not None:
+            cached["extracted_text"] = text
+            cached["cache"] = verdict_cache.info("HIT", tier)
+            yield "final", cached
+            return
+
+    events: asyncio.Queue = asyncio.Queue()
+    task, shared = analysis_flights.start(key, lambda: _stream_and_store(key, text, events))
+    if not shared:
+        # Relay this run's events; if the client goes away the run still finishes for the others.
+        while (item := await events.get()) is not None:
+            yield item
+    result = copy.deepcopy(await asyncio.shield(task))
+    result["extracted_text"] = text
+    if not settings.VERDICT_CACHE_ENABLED:
+        status = "BYPASS"
+    else:
+        status = "COALESCED" if shared else "MISS"
+    result["cache"] = verdict_cache.info(status)
+    yield "final", result
+
+
+async def stream_url_analysis(url: str) -> AsyncIterator[Tuple[str, Any]]:
+    article_text = await fetch_article_text_from_url(url)
+    if not article_text:
+        yield "error", {"detail": "Could not fetch or process the article from the URL."}
+        return
+    async for event in stream_analysis_events(article_text):
+        yield event
+
+
+async def stream_image_analysis(images: List[bytes]) -> AsyncIterator[Tuple[str, Any]]:
+    try:
+        text = await extract_text_from_images(images)
+    except Exception as e:
+        logger.error("OCR processing error: %s", e)
+        text = ""
+    if not text:
+        yield "error", {"detail": "Could not extract readable text from the image."}
+        return
+    async for event in stream_analysis_events(text):
+        yield event
+
+
+async def stream_voice_analysis(audio: BinaryIO) -> AsyncIterator[Tuple[str, Any]]:
+    """Emits a "transcript" event per transcribed chunk, then the analysis events."""
+    transcript = None
+    try:
+        async for transcript in iter_transcript_async(audio):
+            yield "transcript", {"text": transcript.text, **transcript.info()}
+    except Exception as e:
+        yield "error", {"detail": f"Voice transcription failed: {e}"}
+        return
+    if transcript is None or not transcript.text:
+        yield "error", {"detail": "Could not understand the audio."}
+        return
+    async for event, payload in stream_analysis_events(transcript.text):
+        if event == "final":
+            payload["transcript"] = transcript.info()
+        yield event, payload
 
 
 async def analyze_url_service(url: str):
-    article_text = fetch_article_text_from_url(url)
+    article_text = await fetch_article_text_from_url(url)
     if not article_text:
         return None
-    return await _get_combined_analysis(article_text)
+    return await _get_cached_analysis(article_text)
 
 
-async def analyze_image_service(image_bytes: str):
-    # if pytesseract is None:
-    #     return None
+async def analyze_image_service(images: List[bytes]):
+    """OCRs one or more images in parallel and analyzes their combined text once."""
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        text = await asyncio.to_thread(pytesseract.image_to_string, image)
-        print(image)
-        print(text)
-        if not text.strip():
+        text = await extract_text_from_images(images)
+        if not text:
             return None
-        return await _get_combined_analysis(text.strip())
+        return await _get_cached_analysis(text)
     except Exception as e:
-        print(f"OCR processing error: {e}")
+        logger.error("OCR processing error: %s", e)
         return None
-    # try:
-    #     # Open the image
-    #     image = Image.open(image_path)
-    #     print(f"Loaded image: {image}")
-
-    #     # Run pytesseract in a separate thread to avoid blocking
-    #     text = await asyncio.to_thread(pytesseract.image_to_string, image)
-    #     print(f"Extracted text:\n{text}")
-
-    #     if not text.strip():
-    #         return None
-    #     return await _get_combined_analysis(text.strip())
-
-    # except Exception as e:
-    #     print(f"OCR processing error: {e}")
-    #     return None
 
 
-async def analyze_voice_service(voice_file_path: str):
-    if whisper_model is None:
-        return {"error": "Whisper model is not available."}
+async def analyze_voice_service(audio: BinaryIO):
     try:
-        result = await asyncio.to_thread(whisper_model.transcribe, voice_file_path)
-        text = result.get("text", "")
-        if not text.strip():
+        transcript = await transcribe(audio)
+        if not transcript.text:
             return {"error": "Could not understand the audio."}
-        return await _get_combined_analysis(text)
+        result = await _get_cached_analysis(transcript.text)
+        result["transcript"] = transcript.info()
+        return result
     except Exception as e:
         return {"error": f"Voice transcription failed: {e}"}
-        
\ No newline at end of file
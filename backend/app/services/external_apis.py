@@ -1,19 +1,76 @@
 import asyncio
+import logging
+import random
 import httpx
 from typing import Dict, Any, Optional, List
 from ..models.models import SourceResult, SocialMediaPost, FactCheckData, HttpUrl
 from ..core.config.settings import settings # <-- Import the central settings object
+from .http_transport import CircuitBreaker, TokenBucket, UpstreamUnavailable, get_shared_client
+from .social_query import canonical_query, extract_keyphrases, social_result_cache
+from ..core.logging_config import log_payload
+from ..core.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
 
 # --- Base Service ---
 class ExternalAPIService:
-    """Base class for API services to handle common logic like async requests."""
-    def __init__(self, api_name: str, base_url: str):
+    """
+    Base class for API services to handle common logic like async requests.
+    All services share one pooled HTTP client; each has its own rate limiter
+    and circuit breaker.
+    """
+    def __init__(self, api_name: str, stage: str, base_url: str, rate_per_second: float, burst: int):
         self.api_name = api_name
+        self.stage = stage  # label for latency metrics
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(api_name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_shared_client()
+
+    def _error(self, error_msg: str) -> SourceResult:
+        logger.warning("%s", error_msg)
+        return SourceResult(source_name=self.api_name, status="ERROR", data=[], error_message=error_msg)
+
+    async def _send(self, url: str, params: Optional[Dict], headers: Optional[Dict]) -> httpx.Response:
+        """GETs with a bounded number of retries on connection errors and 502/503/504."""
+        retries = max(0, settings.HTTP_MAX_RETRIES)  # the last attempt always returns or raises
+        for attempt in range(retries + 1):
+            last_attempt = attempt == retries
+            try:
+                response = await self.client.get(url, params=params, headers=headers)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                self.rate_limiter.update_from_response(response)
+                # An explicit Retry-After is honoured by the rate limiter, not retried here.
+                if response.status_code not in RETRYABLE_STATUS_CODES or last_attempt or "retry-after" in response.headers:
+                    return response
+            # Jittered exponential backoff between attempts.
+            await asyncio.sleep(settings.HTTP_RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
 
     async def _make_request(self, endpoint: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> SourceResult:
         """Makes an async HTTP request and handles errors, returning a SourceResult."""
+        with track_stage(self.stage) as stage:
+            result = await self._request(endpoint, params, headers)
+            if result.status != "SUCCESS":
+                stage.error()
+            return result
+
+    async def _request(self, endpoint: str, params: Optional[Dict], headers: Optional[Dict]) -> SourceResult:
+        if not self.breaker.allow():
+            return self._error(f"{self.api_name} is unavailable (circuit open, next probe in {self.breaker.retry_in():.0f}s).")
+        try:
+            await self.rate_limiter.acquire(settings.HTTP_RATE_LIMIT_MAX_WAIT_SECONDS)
+        except UpstreamUnavailable as e:
+            self.breaker.record_abandoned()
+            return self._error(f"{self.api_name} request skipped: {e}.")
+
         try:
             # MOCKING LOGIC FOR DEVELOPMENT (can be removed later)
             # await asyncio.sleep(0.5)
@@ -28,19 +85,19 @@ class ExternalAPIService:
             #     ]
             #      return SourceResult(source_name=self.api_name, status="SUCCESS", data=[p.model_dump() for p in mock_data])
             url = f"{self.base_url}{endpoint}"
-            print(f"Making request to {self.api_name}: {url} with params {params}")
-            
-            response = await self.client.get(url, params=params, headers=headers)
+            logger.debug("Making request to %s: %s with params %s", self.api_name, url, params)
+
+            response = await self._send(url, params, headers)
+            # 5xx means the upstream is unhealthy; anything else (even a 4xx) means it is answering.
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
             response.raise_for_status()
             
             api_data = response.json()
-
-            import json
-            print("="*50)
-            print(f"RAW API RESPONSE FROM: {self.api_name}")
-            # Use json.dumps for pretty-printing the JSON in your terminal
-            print(json.dumps(api_data, indent=2))
-            print("="*50)
+            # Sampled, and only serialized when DEBUG logging is on.
+            log_payload(logger, f"Raw API response from {self.api_name}", api_data)
 
             return SourceResult(
                 source_name=self.api_name,
@@ -49,32 +106,63 @@ class ExternalAPIService:
                 error_message=None,
             )
 
+        except asyncio.CancelledError:
+            self.breaker.record_abandoned()
+            raise
+        except httpx.TransportError as e:
+            self.breaker.record_failure()
+            return self._error(f"An unexpected error occurred with {self.api_name}: {e}")
         except Exception as e:
-            error_msg = f"An unexpected error occurred with {self.api_name}: {e}"
-            print(f"{error_msg}")
-            return SourceResult(source_name=self.api_name, status="ERROR", data=[], error_message=error_msg)
+            # e.g. an HTTP error status or an undecodable body; a half-open probe must not keep its slot.
+            self.breaker.record_abandoned()
+            return self._error(f"An unexpected error occurred with {self.api_name}: {e}")
+
+    async def _search(self, text: str, run_query) -> SourceResult:
+        """
+        Searches for the keyphrases of `text` rather than the text itself.
+        Results are cached per canonical query, so texts on the same topic
+        reuse them.
+        """
+        keyphrases = await asyncio.to_thread(extract_keyphrases, text)
+        if not keyphrases:
+            # Nothing was sent and nothing failed, so this is not an upstream error.
+            return SourceResult(source_name=self.api_name, status="SKIPPED", data=[], error_message="No searchable keyphrases in the text.")
+        # Multi-word phrases are searched as exact phrases.
+        query = " ".join(f'"{k}"' if " " in k else k for k in keyphrases)
+        if not settings.SOCIAL_CACHE_ENABLED:
+            return await run_query(query)
+        return await social_result_cache.get_or_fetch(self.api_name, canonical_query(keyphrases), lambda: run_query(query))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"circuit": self.breaker.stats(), "rate_limit": self.rate_limiter.stats()}
 
 # --- Specific Service Implementations ---
 class XService(ExternalAPIService):
     def __init__(self):
-        super().__init__("X (Twitter)", "https://api.x.com/2/")
+        super().__init__("X (Twitter)", "x", settings.X_API_BASE_URL, settings.X_RATE_LIMIT_PER_SECOND, settings.X_RATE_LIMIT_BURST)
         # Securely get the bearer token from our central settings object
         self.headers = {"Authorization": f"Bearer {settings.X_BEARER_TOKEN}"}
 
-    async def search_posts(self, query: str) -> SourceResult:
+    async def search_posts(self, text: str) -> SourceResult:
+        return await self._search(text, self._search_recent)
+
+    async def _search_recent(self, query: str) -> SourceResult:
         endpoint = "tweets/search/recent"
         params = {"query": query, "max_results": 5}
         return await self._make_request(endpoint, params=params, headers=self.headers)
 
 class RedditService(ExternalAPIService):
     def __init__(self):
-        super().__init__("Reddit", "https://oauth.reddit.com/")
+        super().__init__("Reddit", "reddit", settings.REDDIT_API_BASE_URL, settings.REDDIT_RATE_LIMIT_PER_SECOND, settings.REDDIT_RATE_LIMIT_BURST)
         self.headers = {
             "Authorization": f"bearer {getattr(settings, 'REDDIT_TOKEN', '')}",
             "User-Agent": "FakeNewsDetector/0.1"
         }
     
-    async def search_posts(self, query: str) -> SourceResult:
+    async def search_posts(self, text: str) -> SourceResult:
+        return await self._search(text, self._search_all)
+
+    async def _search_all(self, query: str) -> SourceResult:
         endpoint = "r/all/search"
         params = {"q": query, "sort": "relevance", "limit": 3}
         return await self._make_request(endpoint, params=params)
@@ -0,0 +1,207 @@
+"""
+Write-behind buffer for feedback documents.
+
+Documents get their ObjectId client-side and are acknowledged at once; they
+reach MongoDB in unordered insert_many batches, flushed when a batch fills
+up or when the oldest buffered document has waited `flush_interval_ms`.
+
+Transient failures (network errors, timeouts, an unavailable primary) are
+retried up to `max_retries` times per document; documents MongoDB rejects
+outright (validation errors and the like) are logged and dropped.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+from ..core.config.settings import settings
+from ..core.metrics import register_gauge, track_stage
+from ..database.database import feedback_collection
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000  # a retried document that already made it in
+# Server error codes worth retrying: network trouble, elections, shutdowns, time limits.
+TRANSIENT_CODES = {6, 7, 50, 89, 91, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436}
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError, OSError, asyncio.TimeoutError)
+
+
+class FeedbackBufferFull(Exception):
+    """More documents are waiting to be written than the buffer holds."""
+
+
+class FeedbackBuffer:
+    """
+    Buffers inserts into `collection` and writes them in bulk.
+
+    At most `max_pending` documents are held (buffered or being written);
+    add() raises FeedbackBufferFull beyond that, which is also what happens
+    while MongoDB is unreachable and failed batches are being retried.
+    """
+
+    def __init__(self, collection, max_batch_size: int, flush_interval_ms: float, max_pending: int, max_retries: int):
+        self.collection = collection
+        self.max_batch_size = max(1, max_batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.max_pending = max(self.max_batch_size, max_pending)
+        self.max_retries = max(0, max_retries)
+        self._attempts: Dict[ObjectId, int] = {}  # failed attempts of documents being retried
+        self._buffer: List[Dict[str, Any]] = []
+        self._writing = 0  # documents in batches currently being written
+        self._writes: Set[asyncio.Task] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) + self._writing
+
+    def add(self, document: Dict[str, Any]) -> ObjectId:
+        """Assigns the document its _id and queues it; returns the _id. Raises FeedbackBufferFull."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise FeedbackBufferFull(f"{self.pending} feedback documents are waiting to be written")
+        document.setdefault("_id", ObjectId())
+        self._buffer.append(document)
+        self.accepted += 1
+
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_now)
+        return document["_id"]
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._buffer:
+            batch = self._buffer[:self.max_batch_size]
+            del self._buffer[:self.max_batch_size]
+            self._writing += len(batch)
+            task = asyncio.ensure_future(self._write(batch))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        retry: List[Dict[str, Any]] = []
+        drop: List[Dict[str, Any]] = []
+        try:
+            with track_stage("feedback_flush") as stage:
+                try:
+                    await self.collection.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # Unordered: everything but the reported documents was inserted.
+                    failed = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+                    for error in failed:
+                        (retry if error.get("code") in TRANSIENT_CODES else drop).append(batch[error["index"]])
+                    if failed:
+                        stage.error()
+                        logger.warning("%d of %d feedback document(s) failed to insert: %s", len(failed), len(batch), failed[0].get("errmsg"))
+                except TRANSIENT_ERRORS as e:
+                    stage.error()
+                    retry = batch
+                    logger.warning("Feedback batch of %d failed, will retry: %s", len(batch), e)
+                except Exception as e:
+                    stage.error()
+                    drop = batch
+                    logger.error("Feedback batch of %d was rejected: %s", len(batch), e)
+        finally:
+            self._writing -= len(batch)
+
+        failed_ids = {id(document) for document in retry + drop}
+        if len(failed_ids) < len(batch):
+            self.batches += 1
+            self.written += len(batch) - len(failed_ids)
+            for document in batch:
+                if id(document) not in failed_ids:
+                    self._attempts.pop(document["_id"], None)
+        if drop:
+            self._drop(drop, "rejected by MongoDB")
+        retry = [document for document in retry if self._count_attempt(document)]
+        if retry:
+            self.failed_batches += 1
+            # Back in front of the queue; they still count against max_pending.
+            self._buffer[:0] = retry
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(max(self.flush_interval, 1.0), self._flush_now)
+
+    def _count_attempt(self, document: Dict[str, Any]) -> bool:
+        """Records a transient failure; False (and the document is dropped) once it has used up its retries."""
+        attempts = self._attempts.get(document["_id"], 0) + 1
+        if attempts > self.max_retries:
+            self._drop([document], f"still failing after {self.max_retries} retries")
+            return False
+        self._attempts[document["_id"]] = attempts
+        return True
+
+    def _drop(self, documents: List[Dict[str, Any]], reason: str):
+        for document in documents:
+            self._attempts.pop(document["_id"], None)
+        self.dropped += len(documents)
+        logger.error("Dropped %d feedback document(s), %s: %s", len(documents), reason, ", ".join(str(d["_id"]) for d in documents[:5]))
+
+    async def flush(self, timeout: float) -> int:
+        """
+        Writes out everything buffered, retrying failed batches until `timeout`
+        seconds have passed. Returns the number of documents still unwritten.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.pending:
+            self._flush_now()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            if self._writes:
+                await asyncio.wait(set(self._writes), timeout=remaining)
+            elif self._buffer:
+                await asyncio.sleep(min(remaining, 0.1))  # a failed batch was just re-queued
+        return self.pending
+
+    async def close(self, timeout: float):
+        """Durable flush for shutdown; logs anything that could not be written."""
+        unwritten = await self.flush(timeout)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if unwritten:
+            logger.error("%d feedback document(s) could not be written before shutdown.", unwritten)
+        elif self.accepted:
+            logger.info("Feedback buffer flushed (%d document(s) written).", self.written)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "flush_interval_ms": self.flush_interval * 1000.0,
+            "max_pending": self.max_pending,
+            "buffered": len(self._buffer),
+            "writing": self._writing,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+            "max_retries": self.max_retries,
+            "mean_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+feedback_buffer = FeedbackBuffer(
+    feedback_collection,
+    max_batch_size=settings.FEEDBACK_BATCH_MAX_SIZE,
+    flush_interval_ms=settings.FEEDBACK_FLUSH_INTERVAL_MS,
+    max_pending=settings.FEEDBACK_BUFFER_MAX_PENDING,
+    max_retries=settings.FEEDBACK_MAX_RETRIES,
+)
+register_gauge("feedback_buffer_pending", "Feedback documents accepted but not yet written to MongoDB.", lambda: feedback_buffer.pending)
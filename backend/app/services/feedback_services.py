@@ -1,11 +1,19 @@
+from bson import ObjectId
+from ..core.config.settings import settings
 from ..database.database import feedback_collection
 from ..models.models import FeedbackIn, FeedbackOut
+from .feedback_buffer import feedback_buffer
 
 async def save_feedback_service(request: FeedbackIn) -> FeedbackOut:
-    result = await feedback_collection.insert_one(request.dict())
-    new_feedback = await feedback_collection.find_one({"_id": result.inserted_id})
-    
-    # Convert ObjectId to str here before returning
-    new_feedback["_id"] = str(new_feedback["_id"])
-    
-    return FeedbackOut(**new_feedback)
\ No newline at end of file
+    """
+    Stores a rating. The _id is generated here, so the response needs no read
+    back; with the write-behind buffer on, the insert itself happens in the
+    next bulk flush (raises FeedbackBufferFull when the buffer is full).
+    """
+    document = request.model_dump()
+    if settings.FEEDBACK_BUFFER_ENABLED:
+        feedback_buffer.add(document)
+    else:
+        document["_id"] = ObjectId()
+        await feedback_collection.insert_one(document)
+    return FeedbackOut(**{**document, "_id": str(document["_id"])})
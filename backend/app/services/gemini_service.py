@@ -1,50 +1,36 @@
 # In gemini_service.py (now functioning as an OpenAI service)
 
 import json
-import subprocess
-import sys
+import logging
 from ..core.config.settings import settings
-import os
+from ..core.components import register_component
+from ..core.logging_config import log_payload
+from ..core.metrics import track_stage
 
-# --- 1. Package Installation and OpenAI Client Setup ---
-def ensure_package_installed():
-    try:
-        import openai
-        return True
-    except ImportError:
-        print("Installing openai package...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "openai"])
-            return True
-        except Exception as e:
-            print(f"Failed to install openai package: {e}")
-            return False
-
-OPENAI_AVAILABLE = ensure_package_installed()
-client = None
+logger = logging.getLogger(__name__)
 
-if OPENAI_AVAILABLE:
+# --- 1. OpenAI Client Setup ---
+# The openai package is a regular dependency (see requirements.txt); the client
+# is created on first use (or by the startup warm-up) instead of at import time.
+def _create_openai_client():
     from openai import AsyncOpenAI
-    try:
-        # Modern client initialization (requires OPENAI_API_KEY to be set in your environment)
-        if not settings.GEMINI_API_KEY:
-             raise ValueError("OPENAI_API_KEY is not set in your configuration/environment.")
-        
-        client = AsyncOpenAI(api_key=settings.GEMINI_API_KEY)
-        print("OpenAI client configured successfully!")
-    except Exception as e:
-        print(f"Error configuring OpenAI client: {e}")
-        OPENAI_AVAILABLE = False
-else:
-    print("Warning: openai package is not available.")
+    # Modern client initialization (requires OPENAI_API_KEY to be set in your environment)
+    if not settings.GEMINI_API_KEY:
+        raise ValueError("OPENAI_API_KEY is not set in your configuration/environment.")
+    client = AsyncOpenAI(api_key=settings.GEMINI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+    logger.info("OpenAI client configured successfully!")
+    return client
+
+openai_component = register_component("openai", _create_openai_client)
 
 # --- 2. The Core Analysis Function (Using modern OpenAI syntax) ---
 async def analyze_credibility(text: str) -> dict:
     """
     Analyzes text credibility using OpenAI's GPT API.
     """
-    if not OPENAI_AVAILABLE or client is None:
-        print("OpenAI is not available. Check API key and package installation.")
+    client = await openai_component.get_async()
+    if client is None:
+        logger.warning("OpenAI is not available. Check API key and package installation. (%s)", openai_component.error)
         return {"verdict": "Unknown", "explanation": "OpenAI API not available."}
 
     # Choose a real, available OpenAI model.
@@ -67,25 +53,26 @@ async def analyze_credibility(text: str) -> dict:
     """
 
     try:
-        print(f"Sending request to OpenAI model: {MODEL_NAME}")
-        
+        logger.debug("Sending request to OpenAI model: %s", MODEL_NAME)
+
         # This is the modern, correct way to call the API asynchronously
-        response = await client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Please analyze this text: \"{text}\""}
-            ],
-            # This crucial setting forces the model to output valid JSON
-            response_format={"type": "json_object"} 
-        )
+        with track_stage("openai"):
+            response = await client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Please analyze this text: \"{text}\""}
+                ],
+                # This crucial setting forces the model to output valid JSON
+                response_format={"type": "json_object"} 
+            )
         
         # Extract the JSON content from the response
         analysis_result_str = response.choices[0].message.content
         analysis_result = json.loads(analysis_result_str)
         
-        print("Successfully received and parsed response from OpenAI.")
-        
+        log_payload(logger, "OpenAI response", analysis_result)
+
         return {
             "verdict": analysis_result.get("verdict", "Unknown"),
             "confidence": int(analysis_result.get("confidence", 0)),
@@ -94,7 +81,7 @@ async def analyze_credibility(text: str) -> dict:
         }
         
     except Exception as e:
-        print(f"OpenAI API Error: {str(e)}")
+        logger.error("OpenAI API Error: %s", e)
         # Return a structured error so the fallback logic works correctly
         return {
             "verdict": "Unknown",
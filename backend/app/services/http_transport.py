@@ -0,0 +1,218 @@
+"""
+Shared outbound HTTP transport for the external API services: one pooled
+client, a rate-limit-aware token bucket per upstream and a circuit breaker
+per upstream.
+"""
+import asyncio
+import importlib.util
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """The request was not sent because the upstream's rate limit would be exceeded."""
+
+
+# --- Shared client ---
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Pooled client shared by every ExternalAPIService; created on first use."""
+    global _shared_client
+    if _shared_client is None:
+        use_http2 = settings.HTTP2_ENABLED and http2_available()
+        _shared_client = httpx.AsyncClient(
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        logger.info("Shared HTTP client created (HTTP/2: %s).", "on" if use_http2 else "off")
+    return _shared_client
+
+
+async def close_shared_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+# --- Rate limiting ---
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either a number of seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter for one upstream. Tokens refill at `rate` per
+    second up to `capacity`. The upstream's own accounting wins: when it
+    reports no remaining requests (x-rate-limit-remaining / x-ratelimit-remaining)
+    or answers with Retry-After, the bucket stays empty until the reset time.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # monotonic time before which no request may be sent
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _wait_time(self, now: float) -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    async def acquire(self, max_wait: float):
+        """Takes one token, waiting up to max_wait seconds for it; raises UpstreamUnavailable otherwise."""
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._wait_time(now)
+            if wait <= 0:
+                self.tokens -= 1.0
+                return
+            if wait > max_wait:
+                self.throttled += 1
+                raise UpstreamUnavailable(f"rate limited for another {wait:.1f}s")
+            await asyncio.sleep(wait)
+            max_wait -= wait
+
+    def update_from_response(self, response: httpx.Response):
+        headers = response.headers
+        now = time.monotonic()
+        remaining = headers.get("x-rate-limit-remaining") or headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-rate-limit-reset") or headers.get("x-ratelimit-reset")
+        if remaining is not None:
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                remaining = None
+        if remaining is not None:
+            self._refill(now)
+            self.tokens = min(self.tokens, remaining)
+            if remaining < 1 and reset:
+                try:
+                    reset = float(reset)
+                    # X sends an epoch timestamp, Reddit the seconds until reset.
+                    seconds = reset - time.time() if reset > 1e9 else reset
+                    self.blocked_until = max(self.blocked_until, now + max(0.0, seconds))
+                except ValueError:
+                    pass
+        if response.status_code in (429, 503):
+            retry_after = _retry_after_seconds(headers.get("retry-after"))
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            elif response.status_code == 429:
+                self.tokens = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_second": self.rate,
+            "blocked_for_seconds": round(max(0.0, self.blocked_until - now), 2),
+            "throttled": self.throttled,
+        }
+
+
+# --- Circuit breaker ---
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is unhealthy. After `failure_threshold`
+    consecutive failures the circuit opens and requests are rejected without
+    being sent. Once `reset_seconds` have passed, a single probe request is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("Circuit for %s opened after %d consecutive failure(s).", self.name, self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """The caller gave up (e.g. its latency budget ran out); frees the probe slot without judging health."""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 2) if self.state == OPEN else None,
+        }
@@ -0,0 +1,130 @@
+import io
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.config.settings import settings
+from ..core.metrics import register_cache
+
+HASH_BITS = 64
+
+
+def dhash(image_bytes: bytes) -> int:
+    """
+    64-bit difference hash: shrink to 9x8 greyscale and record whether each
+    pixel is brighter than its right-hand neighbour. Re-compression, resizing
+    and light crops only flip a few bits.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes))
+    # Lets the JPEG decoder skip most of the full-resolution work.
+    image.draft("L", (64, 64))
+    pixels = list(image.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            right = pixels[row * 9 + column + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+class PerceptualHashCache:
+    """
+    Size-bounded LRU of OCR texts keyed by perceptual hash, with
+    nearest-neighbour lookup within a Hamming distance.
+
+    Lookups use multi-index hashing: the 64 bits are split into
+    max_distance + 1 bands, so any hash within max_distance of a stored
+    one matches it exactly on at least one band. Only those candidates are
+    compared bit by bit.
+    """
+
+    def __init__(self, max_entries: int, max_distance: int):
+        self.max_entries = max(1, max_entries)
+        self.max_distance = max(0, min(max_distance, HASH_BITS - 1))
+        self._entries: "OrderedDict[int, str]" = OrderedDict()
+        self._bands = self._band_layout(self.max_distance + 1)
+        self._index: Dict[Tuple[int, int], Set[int]] = {}
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _band_layout(count: int) -> List[Tuple[int, int]]:
+        """(shift, mask) for each band, splitting the hash as evenly as possible."""
+        layout = []
+        start = 0
+        for band in range(count):
+            width = HASH_BITS // count + (1 if band < HASH_BITS % count else 0)
+            layout.append((start, (1 << width) - 1))
+            start += width
+        return layout
+
+    def _band_keys(self, value: int):
+        for number, (shift, mask) in enumerate(self._bands):
+            yield number, (value >> shift) & mask
+
+    def lookup(self, value: int) -> Optional[str]:
+        """Returns the OCR text of the nearest stored image within max_distance, if any."""
+        best, best_distance = None, self.max_distance + 1
+        if value in self._entries:
+            best, best_distance = value, 0
+        else:
+            for key in self._band_keys(value):
+                for candidate in self._index.get(key, ()):
+                    distance = (candidate ^ value).bit_count()
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if best_distance == 0:
+            self.exact_hits += 1
+        self._entries.move_to_end(best)
+        return self._entries[best]
+
+    def add(self, value: int, text: str):
+        if value in self._entries:
+            self._entries[value] = text
+            self._entries.move_to_end(value)
+            return
+        self._entries[value] = text
+        for key in self._band_keys(value):
+            self._index.setdefault(key, set()).add(value)
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        value, _ = self._entries.popitem(last=False)
+        for key in self._band_keys(value):
+            bucket = self._index.get(key)
+            if bucket is not None:
+                bucket.discard(value)
+                if not bucket:
+                    del self._index[key]
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+image_hash_cache = PerceptualHashCache(
+    max_entries=settings.PHASH_CACHE_MAX_ENTRIES,
+    max_distance=settings.PHASH_MAX_DISTANCE,
+)
+register_cache("ocr_phash", lambda: (image_hash_cache.hits, image_hash_cache.misses))
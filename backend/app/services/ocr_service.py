@@ -0,0 +1,198 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from ..core.config.settings import settings
+from ..core.components import register_component
+from ..core.metrics import register_gauge, track_stage
+from .image_hash_cache import dhash, image_hash_cache
+
+logger = logging.getLogger(__name__)
+
+ASSUMED_SOURCE_DPI = 72      # screenshots rarely carry DPI metadata
+INK_ROW_THRESHOLD = 2        # mean ink (0-255) for a pixel row to count as text
+REGION_PADDING = 12          # pixels kept around the detected text region
+
+
+def _load_ocr():
+    import pytesseract
+    # Fails fast when the tesseract binary itself is missing.
+    pytesseract.get_tesseract_version()
+    return pytesseract
+
+ocr_component = register_component("ocr", _load_ocr)
+
+
+# --- Image preprocessing (runs inside the OCR worker processes) ---
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Grey level that best separates ink from background."""
+    total = sum(histogram)
+    sum_all = sum(i * h for i, h in enumerate(histogram))
+    sum_background = 0.0
+    weight_background = 0
+    best_threshold, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        weight_background += count
+        if weight_background == 0:
+            continue
+        weight_foreground = total - weight_background
+        if weight_foreground == 0:
+            break
+        sum_background += level * count
+        mean_background = sum_background / weight_background
+        mean_foreground = (sum_all - sum_background) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = level, variance
+    return best_threshold
+
+
+def _text_bounding_box(binary) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding box of the rows/columns that contain ink, or None for a blank image."""
+    from PIL import Image, ImageOps
+
+    ink = ImageOps.invert(binary)
+    width, height = ink.size
+    # Averaging each row/column down to one pixel is a cheap projection profile.
+    rows = list(ink.resize((1, height), Image.BOX).getdata())
+    columns = list(ink.resize((width, 1), Image.BOX).getdata())
+    text_rows = [y for y, value in enumerate(rows) if value >= INK_ROW_THRESHOLD]
+    text_columns = [x for x, value in enumerate(columns) if value >= INK_ROW_THRESHOLD]
+    if not text_rows or not text_columns:
+        return None
+    return (
+        max(0, text_columns[0] - REGION_PADDING),
+        max(0, text_rows[0] - REGION_PADDING),
+        min(width, text_columns[-1] + 1 + REGION_PADDING),
+        min(height, text_rows[-1] + 1 + REGION_PADDING),
+    )
+
+
+def preprocess_image(image_bytes: bytes, target_dpi: int, max_dimension: int):
+    """
+    Prepares an upload for tesseract: fixes orientation, converts to greyscale,
+    rescales to the target DPI (never beyond max_dimension on the long side),
+    binarizes with an Otsu threshold and crops to the text region.
+    Returns None when the image holds no ink at all.
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(image_bytes))
+    image = ImageOps.exif_transpose(image).convert("L")
+
+    source_dpi = image.info.get("dpi", (ASSUMED_SOURCE_DPI,))[0] or ASSUMED_SOURCE_DPI
+    scale = min(target_dpi / float(source_dpi), max_dimension / float(max(image.size)))
+    if abs(scale - 1.0) > 0.05:
+        new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(new_size, Image.LANCZOS)
+
+    image = ImageOps.autocontrast(image)
+    threshold = _otsu_threshold(image.histogram())
+    binary = image.point(lambda value: 255 if value > threshold else 0)
+    # Light text on a dark background (dark mode screenshots): make the ink dark.
+    histogram = binary.histogram()
+    if histogram[0] > histogram[255]:
+        binary = ImageOps.invert(binary)
+
+    box = _text_bounding_box(binary)
+    if box is None:
+        return None
+    return binary.crop(box)
+
+
+def _ocr_worker(image_bytes: bytes, target_dpi: int, max_dimension: int) -> str:
+    import pytesseract
+
+    image = preprocess_image(image_bytes, target_dpi, max_dimension)
+    if image is None:
+        return ""
+    return pytesseract.image_to_string(image, config=f"--dpi {target_dpi}").strip()
+
+
+# --- Bounded OCR process pool ---
+
+class OCRExecutor:
+    """
+    Runs preprocessing + tesseract in a bounded process pool. At most
+    `workers` tesseract processes run at once and at most `max_queue` images
+    are in flight (running or queued); further callers wait for a slot.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.completed = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("OCR executor started: %d process worker(s), queue bound %d.", self.workers, self.max_queue)
+        return self._pool
+
+    async def extract_text(self, image_bytes: bytes) -> str:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                with track_stage("tesseract"):
+                    return await loop.run_in_executor(
+                        self._get_pool(), _ocr_worker, image_bytes, settings.OCR_TARGET_DPI, settings.OCR_MAX_DIMENSION
+                    )
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+        }
+
+
+ocr_executor = OCRExecutor(workers=settings.OCR_MAX_WORKERS, max_queue=settings.OCR_MAX_QUEUE)
+register_gauge("ocr_in_flight", "Images being OCRed in the process pool.", lambda: ocr_executor.in_flight)
+
+
+async def _extract_text_cached(image_bytes: bytes) -> str:
+    """Near-duplicates of an image we've already read skip tesseract entirely."""
+    if not settings.PHASH_CACHE_ENABLED:
+        return await ocr_executor.extract_text(image_bytes)
+
+    try:
+        image_hash = await asyncio.to_thread(dhash, image_bytes)
+    except Exception as e:
+        logger.warning("Could not hash image, running OCR without the cache: %s", e)
+        return await ocr_executor.extract_text(image_bytes)
+
+    text = image_hash_cache.lookup(image_hash)
+    if text is None:
+        text = await ocr_executor.extract_text(image_bytes)
+        image_hash_cache.add(image_hash, text)
+    return text
+
+
+async def extract_text_from_images(images: List[bytes]) -> str:
+    """OCRs every image in parallel and joins the texts in upload order."""
+    if await ocr_component.get_async() is None:
+        raise RuntimeError(f"OCR is not available: {ocr_component.error}")
+    texts = await asyncio.gather(*(_extract_text_cached(image) for image in images))
+    return "\n\n".join(text for text in texts if text)
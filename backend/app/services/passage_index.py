@@ -0,0 +1,287 @@
+"""
+BM25 inverted index over sentence-level passages of the PDF store.
+
+The index is built offline from the page texts in the PDF store and written
+as plain .npy arrays, which are memory-mapped at load time. A query only
+touches the posting lists of its own terms, so its cost depends on how
+often those terms occur, not on how large the corpus is.
+
+    python -m app.services.passage_index    # (re)build from the current PDF store
+
+Layout of one build (a directory named after its build id; CURRENT names the live one):
+    terms.npy             sorted vocabulary (looked up with searchsorted)
+    term_offsets.npy      postings of term i are [term_offsets[i], term_offsets[i + 1])
+    postings.npy          passage ids
+    term_freqs.npy        term frequency of the term in each posting
+    passage_lengths.npy   tokens per passage
+    passage_docs.npy      document index of each passage
+    passage_pages.npy     1-indexed page number of each passage
+    text_offsets.npy      passage i is text_blob[text_offsets[i]:text_offsets[i + 1]] (UTF-8)
+    text_blob.npy
+    meta.json             documents, passage count, average length
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from ..core.config.settings import settings
+from ..core.components import READY, register_component
+from .pdf_store import PdfStore, pdf_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / ".cache" / "passage_index"
+CURRENT_NAME = "CURRENT"
+
+# Same sentence boundaries the page scanner used.
+SENTENCE_SPLIT = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s')
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MAX_TOKEN_LENGTH = 40        # longer "words" are URLs/garbage and would only widen the vocabulary dtype
+MIN_MATCHED_TERMS = 2        # a passage must contain at least this many distinct query terms
+BM25_K1 = 1.2
+BM25_B = 0.75
+STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has have him his how its may new now "
+    "see who did get let say she too use that with this from they been were will what when which their there "
+    "than then them these those into also more most some such only over very just about would could should".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if 2 < len(token) <= MAX_TOKEN_LENGTH and token not in STOPWORDS
+    ]
+
+
+class Passage(NamedTuple):
+    source: str
+    url: str
+    page: int
+    text: str
+    score: float
+
+
+# --- Building ---
+
+def build_index(store: PdfStore, directory: Path) -> Path:
+    """Indexes every document in the store into a new build directory and makes it current."""
+    import numpy as np
+
+    documents = []
+    texts: List[bytes] = []
+    passage_docs: List[int] = []
+    passage_pages: List[int] = []
+    passage_lengths: List[int] = []
+    postings: Dict[str, Dict[int, int]] = {}
+
+    for url, entry in sorted(store.manifest().items()):
+        pages = store.get_pages(url)
+        if not pages:
+            continue
+        doc_index = len(documents)
+        documents.append({"title": entry.get("title", url), "url": url})
+        for page_number, page_text in pages.items():
+            for sentence in SENTENCE_SPLIT.split(page_text):
+                sentence = " ".join(sentence.split())
+                tokens = tokenize(sentence)
+                if not tokens:
+                    continue
+                passage_id = len(texts)
+                texts.append(sentence.encode("utf-8"))
+                passage_docs.append(doc_index)
+                passage_pages.append(page_number)
+                passage_lengths.append(len(tokens))
+                for token in tokens:
+                    term_postings = postings.setdefault(token, {})
+                    term_postings[passage_id] = term_postings.get(passage_id, 0) + 1
+
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    posting_ids, term_freqs = [], []
+    for i, term in enumerate(terms):
+        items = sorted(postings[term].items())
+        posting_ids.extend(p for p, _ in items)
+        term_freqs.extend(f for _, f in items)
+        term_offsets[i + 1] = len(posting_ids)
+    text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    text_offsets[1:] = np.cumsum([len(t) for t in texts])
+
+    build_id = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    build_dir = directory / build_id
+    build_dir.mkdir(parents=True, exist_ok=True)
+    arrays = {
+        "terms": np.array(terms, dtype=str) if terms else np.array([], dtype="<U1"),
+        "term_offsets": term_offsets,
+        "postings": np.array(posting_ids, dtype=np.int32),
+        "term_freqs": np.array(term_freqs, dtype=np.uint16 if max(term_freqs, default=0) < 2 ** 16 else np.uint32),
+        "passage_lengths": np.array(passage_lengths, dtype=np.int32),
+        "passage_docs": np.array(passage_docs, dtype=np.int32),
+        "passage_pages": np.array(passage_pages, dtype=np.int32),
+        "text_offsets": text_offsets,
+        "text_blob": np.frombuffer(b"".join(texts), dtype=np.uint8),
+    }
+    for name, array in arrays.items():
+        np.save(build_dir / f"{name}.npy", array)
+    meta = {
+        "build_id": build_id,
+        "documents": documents,
+        "passages": len(texts),
+        "terms": len(terms),
+        "average_length": (sum(passage_lengths) / len(passage_lengths)) if passage_lengths else 0.0,
+    }
+    with open(build_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Switch CURRENT atomically, then drop older builds.
+    temporary = directory / f"{CURRENT_NAME}.{os.getpid()}.tmp"
+    temporary.write_text(build_id, encoding="utf-8")
+    os.replace(temporary, directory / CURRENT_NAME)
+    for old in directory.iterdir():
+        if old.is_dir() and old.name != build_id:
+            shutil.rmtree(old, ignore_errors=True)
+    logger.info("Passage index built: %d document(s), %d passage(s), %d term(s).", len(documents), len(texts), len(terms))
+    return build_dir
+
+
+# --- Querying ---
+
+class PassageIndex:
+    def __init__(self, build_dir: Path):
+        import numpy as np
+
+        self._np = np
+        with open(build_dir / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        def load(name):
+            return np.load(build_dir / f"{name}.npy", mmap_mode="r")
+
+        self.terms = load("terms")
+        self.term_offsets = load("term_offsets")
+        self.postings = load("postings")
+        self.term_freqs = load("term_freqs")
+        self.passage_lengths = load("passage_lengths")
+        self.passage_docs = load("passage_docs")
+        self.passage_pages = load("passage_pages")
+        self.text_offsets = load("text_offsets")
+        self.text_blob = load("text_blob")
+        self.documents = self.meta["documents"]
+        self.passage_count = self.meta["passages"]
+        self.average_length = self.meta["average_length"] or 1.0
+
+    def _term_id(self, term: str) -> Optional[int]:
+        position = int(self._np.searchsorted(self.terms, term))
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return None
+
+    def _passage_text(self, passage_id: int) -> str:
+        start, end = self.text_offsets[passage_id], self.text_offsets[passage_id + 1]
+        return self.text_blob[start:end].tobytes().decode("utf-8")
+
+    def search(self, query: str, k: int) -> List[Passage]:
+        """Top-k passages by BM25 that contain at least MIN_MATCHED_TERMS distinct query terms."""
+        np = self._np
+        term_ids = [i for i in map(self._term_id, set(tokenize(query))) if i is not None]
+        if len(term_ids) < MIN_MATCHED_TERMS:
+            return []
+
+        candidates, contributions = [], []
+        for term_id in term_ids:
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            passage_ids = self.postings[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1.0 + (self.passage_count - df + 0.5) / (df + 0.5))
+            length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.passage_lengths[passage_ids] / self.average_length)
+            candidates.append(passage_ids)
+            contributions.append(idf * tf * (BM25_K1 + 1.0) / (tf + length_norm))
+
+        passage_ids, inverse = np.unique(np.concatenate(candidates), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        matched_terms = np.bincount(inverse)
+        eligible = np.flatnonzero(matched_terms >= MIN_MATCHED_TERMS)
+        if not len(eligible):
+            return []
+        if len(eligible) > k:
+            eligible = eligible[np.argpartition(-scores[eligible], k - 1)[:k]]
+        eligible = eligible[np.argsort(-scores[eligible], kind="stable")]
+
+        results = []
+        for position in eligible:
+            passage_id = int(passage_ids[position])
+            document = self.documents[int(self.passage_docs[passage_id])]
+            results.append(Passage(
+                source=document["title"],
+                url=document["url"],
+                page=int(self.passage_pages[passage_id]),
+                text=self._passage_text(passage_id),
+                score=float(scores[position]),
+            ))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "build_id": self.meta["build_id"],
+            "documents": len(self.documents),
+            "passages": self.passage_count,
+            "terms": self.meta["terms"],
+        }
+
+
+def index_dir() -> Path:
+    return Path(settings.PASSAGE_INDEX_DIR) if settings.PASSAGE_INDEX_DIR else DEFAULT_INDEX_DIR
+
+
+def _load_passage_index() -> PassageIndex:
+    directory = index_dir()
+    try:
+        build_id = (directory / CURRENT_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        raise RuntimeError(f"No passage index in {directory}; run `python -m app.services.pdf_store` to ingest and index the PDFs.")
+    return PassageIndex(directory / build_id)
+
+passage_index_component = register_component("passage_index", _load_passage_index)
+_checked_at = float("-inf")
+
+
+def _current_build_id() -> Optional[str]:
+    try:
+        return (index_dir() / CURRENT_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+async def get_passage_index() -> Optional["PassageIndex"]:
+    """
+    The live index, or None if there is none. At most every
+    PASSAGE_INDEX_CHECK_SECONDS, CURRENT is re-read: a build switched in by
+    the CLI or another worker is loaded, and a failed load is retried.
+    """
+    global _checked_at
+    now = time.monotonic()
+    retry_failed = now - _checked_at >= settings.PASSAGE_INDEX_CHECK_SECONDS
+    if retry_failed:
+        _checked_at = now
+        if passage_index_component.state == READY:
+            build_id = await asyncio.to_thread(_current_build_id)
+            index = passage_index_component.get()
+            if build_id is not None and index is not None and index.meta["build_id"] != build_id:
+                logger.info("Passage index build %s replaced by %s; reloading.", index.meta["build_id"], build_id)
+                passage_index_component.reset()
+    return await passage_index_component.get_async(retry_failed)
+
+
+if __name__ == "__main__":
+    from ..core.logging_config import setup_logging
+
+    setup_logging()
+    build_index(pdf_store, index_dir())
@@ -0,0 +1,362 @@
+"""
+Persistent page-text store for the official PDFs used by verification.
+
+Each PDF is downloaded (or imported from a local directory) and parsed once
+by the ingestion stage. Its page texts are kept as a gzip-compressed JSON
+list named after the SHA-256 of the PDF bytes. A manifest maps each document
+URL to its current content hash. At request time verification reads from
+this store (via the passage index). With VERIFICATION_FETCH_MISSING on,
+relevant documents that have not been ingested yet are scanned on first
+demand and then ingested in the background, so they are fetched once.
+
+    python -m app.services.pdf_store                     # ingest documents not yet in the store
+    python -m app.services.pdf_store --from-dir ./pdfs   # import local copies (matched by file name)
+    python -m app.services.pdf_store --refresh URL       # re-fetch one document
+    python -m app.services.pdf_store --refresh-all
+
+The passage index (see passage_index.py) is rebuilt after every ingestion run.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "pdf_store"
+MANIFEST_NAME = "manifest.json"
+
+
+# --- PyMuPDF parsing (runs inside the parser worker processes) ---
+# Workers get the path of a temporary copy of the PDF, not its bytes, so a
+# document isn't pickled into every page-range task.
+
+def _page_count(path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path, filetype="pdf") as pdf_document:
+        return len(pdf_document)
+
+
+def _parse_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop), 0-indexed."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path, filetype="pdf") as pdf_document:
+        return [pdf_document.load_page(page_num).get_text("text") for page_num in range(start, stop)]
+
+
+def _write_temporary_pdf(content: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="pdf-parse-", suffix=".pdf", delete=False) as f:
+        f.write(content)
+        return f.name
+
+
+def _remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class PdfParser:
+    """
+    Parses PDFs in a process pool so PyMuPDF never blocks the event loop.
+    Each document is split into page ranges that are parsed in parallel and
+    handed back in page order as soon as each range is done.
+    """
+
+    def __init__(self, workers: int, pages_per_task: int):
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.documents = 0
+        self.pages = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("PDF parser started: %d process worker(s).", self.workers)
+        return self._pool
+
+    async def iter_pages(self, content: bytes) -> AsyncIterator[Tuple[int, str]]:
+        """Yields (1-indexed page number, text). Closing the iterator early cancels the remaining ranges."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        path = await asyncio.to_thread(_write_temporary_pdf, content)
+        ranges = []
+        try:
+            page_count = await loop.run_in_executor(pool, _page_count, path)
+            ranges = [
+                asyncio.ensure_future(loop.run_in_executor(pool, _parse_page_range, path, start, min(start + self.pages_per_task, page_count)))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            self.documents += 1
+            page_number = 0
+            for pending in ranges:
+                for text in await pending:
+                    page_number += 1
+                    self.pages += 1
+                    yield page_number, text
+        finally:
+            for pending in ranges:
+                pending.cancel()
+            # Ranges already running keep their open handle; unlinking is safe.
+            _remove_file(path)
+
+    async def parse(self, content: bytes) -> List[str]:
+        return [text async for _, text in self.iter_pages(content)]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "documents": self.documents, "pages": self.pages}
+
+
+pdf_parser = PdfParser(workers=settings.PDF_PARSE_WORKERS, pages_per_task=settings.PDF_PAGES_PER_TASK)
+
+
+class PdfStore:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._manifest_mtime: Optional[int] = None
+        self._save_lock = threading.Lock()
+        self._pages: Dict[str, Dict[int, str]] = {}  # content hash -> {page number: text}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    # --- storage ---
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def _document_path(self, content_hash: str) -> Path:
+        return self.directory / "docs" / f"{content_hash}.json.gz"
+
+    def _manifest_stamp(self) -> Optional[int]:
+        try:
+            return self.manifest_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        """url -> entry; re-read whenever another process (the CLI, another worker) has rewritten the file."""
+        stamp = self._manifest_stamp()
+        if self._manifest is None or stamp != self._manifest_mtime:
+            self._manifest = self._read_manifest()
+            self._manifest_mtime = stamp
+        return self._manifest
+
+    def _save_entry(self, url: str, entry: Dict[str, Any]):
+        """Writes one entry into the manifest, re-reading the file first so entries saved by other processes are kept."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._save_lock:
+            manifest = self._read_manifest()
+            manifest[url] = entry
+            temporary = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(temporary, self.manifest_path)
+            self._manifest = manifest
+            self._manifest_mtime = self._manifest_stamp()
+
+    def _write_pages(self, content_hash: str, pages: List[str]):
+        path = self._document_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(temporary, "wt", encoding="utf-8") as f:
+            json.dump(pages, f, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    def _read_pages(self, content_hash: str) -> List[str]:
+        with gzip.open(self._document_path(content_hash), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    # --- request-time reads ---
+    def get_pages(self, url: str) -> Dict[int, str]:
+        """Page number (1-indexed) -> text for an ingested document; empty if it isn't in the store."""
+        entry = self.manifest().get(url)
+        if entry is None:
+            return {}
+        content_hash = entry["sha256"]
+        pages = self._pages.get(content_hash)
+        if pages is None:
+            try:
+                pages = dict(enumerate(self._read_pages(content_hash), start=1))
+            except (OSError, ValueError) as e:
+                logger.error("PDF store entry for %s is unreadable: %s", url, e)
+                return {}
+            self._pages[content_hash] = pages
+        return pages
+
+    async def get_pages_async(self, url: str) -> Dict[int, str]:
+        entry = self.manifest().get(url)
+        if entry is not None and entry["sha256"] in self._pages:
+            return self._pages[entry["sha256"]]
+        return await asyncio.to_thread(self.get_pages, url)
+
+    def has(self, url: str) -> bool:
+        return url in self.manifest()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "documents": len(self.manifest()),
+            "loaded": len(self._pages),
+        }
+
+    # --- downloads ---
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.PDF_DOWNLOAD_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=settings.PDF_FETCH_CONCURRENCY, max_keepalive_connections=settings.PDF_FETCH_CONCURRENCY),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def download(self, url: str) -> bytes:
+        response = await self._get_client().get(url)
+        response.raise_for_status()
+        return response.content
+
+    # --- ingestion ---
+    async def _obtain(self, doc: Dict[str, Any], local_dir: Optional[Path]):
+        if local_dir is not None:
+            local_path = local_dir / Path(urlsplit(doc["url"]).path).name
+            if local_path.is_file():
+                return await asyncio.to_thread(local_path.read_bytes), f"file:{local_path}"
+        return await self.download(doc["url"]), doc["url"]
+
+    async def ingest_document(self, doc: Dict[str, Any], local_dir: Optional[Path] = None, refresh: bool = False, content: Optional[bytes] = None) -> bool:
+        """
+        Fetches and parses one document into the store (or stores `content`,
+        when the caller already downloaded it). Returns True if the store changed.
+        """
+        url = doc["url"]
+        existing = self.manifest().get(url)
+        if existing is not None and not refresh and self._document_path(existing["sha256"]).exists():
+            return False
+
+        if content is not None:
+            origin = url
+        else:
+            content, origin = await self._obtain(doc, local_dir)
+        content_hash = hashlib.sha256(content).hexdigest()
+        if not self._document_path(content_hash).exists():
+            pages = await pdf_parser.parse(content)
+            await asyncio.to_thread(self._write_pages, content_hash, pages)
+            page_count = len(pages)
+        else:
+            # Same bytes as something already stored: nothing to re-parse.
+            page_count = len(await asyncio.to_thread(self._read_pages, content_hash))
+
+        entry = {
+            "title": doc.get("title", url),
+            "sha256": content_hash,
+            "pages": page_count,
+            "origin": origin,
+            "ingested_at": time.time(),
+        }
+        await asyncio.to_thread(self._save_entry, url, entry)
+        changed = existing is None or existing["sha256"] != content_hash
+        logger.info("PDF store: %s '%s' (%d pages).", "stored" if changed else "refreshed", doc.get("title", url), page_count)
+        return changed
+
+    async def ingest(
+        self,
+        docs: Iterable[Dict[str, Any]],
+        local_dir: Optional[Path] = None,
+        refresh_urls: Iterable[str] = (),
+        refresh_all: bool = False,
+        downloaded: Optional[Dict[str, bytes]] = None,
+    ) -> Dict[str, str]:
+        """
+        Ingests every PDF document in `docs`, downloading up to
+        PDF_FETCH_CONCURRENCY of them at once (none whose bytes are in
+        `downloaded`, url -> content). Returns url -> outcome.
+        """
+        refresh_urls = set(refresh_urls)
+        downloaded = downloaded or {}
+        slots = asyncio.Semaphore(settings.PDF_FETCH_CONCURRENCY)
+        outcomes = {}
+
+        async def ingest_one(doc):
+            url = doc["url"]
+            async with slots:
+                try:
+                    changed = await self.ingest_document(doc, local_dir, refresh=refresh_all or url in refresh_urls, content=downloaded.get(url))
+                    outcomes[url] = "updated" if changed else "unchanged"
+                except Exception as e:
+                    logger.error("PDF store: failed to ingest %s: %s", url, e)
+                    outcomes[url] = f"error: {e}"
+
+        # Only PDFs are ingested
+        await asyncio.gather(*(ingest_one(doc) for doc in docs if doc["url"].lower().endswith(".pdf")))
+        return outcomes
+
+
+pdf_store = PdfStore(Path(settings.PDF_STORE_DIR) if settings.PDF_STORE_DIR else DEFAULT_STORE_DIR)
+
+
+def main():
+    from ..core.logging_config import setup_logging
+    from .passage_index import build_index, index_dir
+    from .verification_services import MOCKED_PDF_DATABASE
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Ingest the verification PDFs into the local page-text store.")
+    parser.add_argument("--from-dir", type=Path, help="Directory with local copies of the PDFs, matched by file name.")
+    parser.add_argument("--refresh", action="append", default=[], metavar="URL", help="Re-fetch this document even if it is stored.")
+    parser.add_argument("--refresh-all", action="store_true", help="Re-fetch every document.")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await pdf_store.ingest(MOCKED_PDF_DATABASE, args.from_dir, args.refresh, args.refresh_all)
+        finally:
+            await pdf_store.close()
+            pdf_parser.shutdown()
+
+    outcomes = asyncio.run(run())
+    for url, outcome in outcomes.items():
+        print(f"{outcome:>10}  {url}")
+    build_index(pdf_store, index_dir())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Short, canonical social media search queries built from the analyzed text,
+and a TTL cache of the search results per canonical query.
+"""
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core import ml_model
+from ..core.config.settings import settings
+from ..core.metrics import register_cache
+from ..models.models import SourceResult
+
+# Only used when the ML vectorizer isn't loaded.
+FALLBACK_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]{3,}")
+FALLBACK_STOPWORDS = frozenset(
+    "that this with from have been were will would could should their there they them than then what when which "
+    "while about after before into over under also just more most some such only very your said says".split()
+)
+NUMERIC_TERM = re.compile(r"^[\d\s]+$")
+
+
+def _model_analyzer():
+    """The fitted vectorizer's analyzer, vocabulary and IDF weights, when the ML model is loaded."""
+    scorer = ml_model.scorer
+    if scorer is not None:
+        return scorer.analyzer, scorer.vocabulary, scorer.idf
+    vectorizer = ml_model.vectorizer
+    if vectorizer is None or not hasattr(vectorizer, "vocabulary_"):
+        return None
+    return _build_analyzer(vectorizer), vectorizer.vocabulary_, getattr(vectorizer, "idf_", None)
+
+
+def _model_loaded() -> bool:
+    return ml_model.scorer is not None or ml_model.vectorizer is not None
+
+
+@lru_cache(maxsize=1)
+def _build_analyzer(vectorizer):
+    return vectorizer.build_analyzer()
+
+
+@lru_cache(maxsize=512)
+def _extract_keyphrases(text: str, max_terms: int, use_model: bool) -> Tuple[str, ...]:
+    analyzer = _model_analyzer() if use_model else None
+    counts: Dict[str, int] = {}
+    first_seen: Dict[str, int] = {}
+    if analyzer is not None:
+        analyze, vocabulary, idf = analyzer
+        features = analyze(text)
+    else:
+        vocabulary, idf = None, None
+        features = [t for t in FALLBACK_TOKEN_PATTERN.findall(text.lower()) if t not in FALLBACK_STOPWORDS]
+    for position, feature in enumerate(features):
+        if NUMERIC_TERM.match(feature):
+            continue
+        if vocabulary is not None and feature not in vocabulary:
+            continue
+        counts[feature] = counts.get(feature, 0) + 1
+        first_seen.setdefault(feature, position)
+
+    def weight(term: str) -> float:
+        if idf is None:
+            return float(counts[term])
+        return counts[term] * float(idf[vocabulary[term]])
+
+    ranked = sorted(counts, key=lambda term: (-weight(term), first_seen[term]))
+    chosen: List[str] = []
+    for term in ranked:
+        # With n-gram vocabularies, skip words already covered by a chosen phrase and vice versa.
+        words = set(term.split())
+        if any(words <= set(c.split()) or set(c.split()) <= words for c in chosen):
+            continue
+        chosen.append(term)
+        if len(chosen) == max_terms:
+            break
+    return tuple(chosen)
+
+
+def extract_keyphrases(text: str, max_terms: Optional[int] = None) -> List[str]:
+    """
+    The most distinctive terms of a text, best first: the top TF-IDF terms
+    under the fitted ML vectorizer, or the most frequent content words while
+    the model isn't loaded.
+    """
+    max_terms = max_terms or settings.SOCIAL_QUERY_MAX_TERMS
+    return list(_extract_keyphrases(text, max_terms, _model_loaded()))
+
+
+def canonical_query(keyphrases: List[str]) -> str:
+    """Order-independent cache key, so texts on the same topic share results."""
+    return " ".join(sorted(keyphrases))
+
+
+class SocialResultCache:
+    """
+    (service, canonical query) -> successful SourceResult, in an LRU with a
+    TTL. Concurrent lookups of the same query share one upstream call, which
+    also runs to completion (and fills the cache) if every caller gives up on it.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, SourceResult]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple[str, str]) -> Optional[SourceResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _store(self, key: Tuple[str, str], task: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if getattr(result, "status", None) != "SUCCESS":
+            return  # errors are never cached
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, service_name: str, query: str, fetch: Callable[[], Awaitable[SourceResult]]) -> SourceResult:
+        key = (service_name, query)
+        cached = self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda finished: self._store(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+social_result_cache = SocialResultCache(
+    max_entries=settings.SOCIAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SOCIAL_CACHE_TTL_SECONDS,
+)
+register_cache("social", lambda: (social_result_cache.hits + social_result_cache.coalesced, social_result_cache.misses))
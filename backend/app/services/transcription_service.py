@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import shutil
+import subprocess
+import threading
+from typing import AsyncIterator, BinaryIO, Iterator, NamedTuple
+
+from ..core.config.settings import settings
+from ..core.components import register_component
+from ..core.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000          # what Whisper expects
+FRAME_SECONDS = 0.03         # energy frame used to find silences
+READ_SECONDS = 1.0           # decoded audio pulled from ffmpeg per read
+FEED_BLOCK_BYTES = 64 * 1024
+
+
+class Transcript(NamedTuple):
+    text: str
+    seconds: float           # audio transcribed so far
+    truncated: bool = False  # stopped at VOICE_ANALYSIS_MIN_WORDS; any later audio was not transcribed
+
+    def info(self) -> dict:
+        return {"words": len(self.text.split()), "transcribed_seconds": round(self.seconds, 1), "truncated": self.truncated}
+
+
+def _load_whisper():
+    import whisper
+    logger.info("Loading Whisper model '%s'...", settings.WHISPER_MODEL_NAME)
+    return whisper.load_model(settings.WHISPER_MODEL_NAME)
+
+whisper_component = register_component("whisper", _load_whisper)
+
+
+def _feed(source: BinaryIO, sink):
+    """Copies the upload into ffmpeg's stdin; stops quietly if ffmpeg has gone away."""
+    try:
+        while True:
+            block = source.read(FEED_BLOCK_BYTES)
+            if not block:
+                break
+            sink.write(block)
+    except (BrokenPipeError, ValueError, OSError):
+        pass
+    finally:
+        try:
+            sink.close()
+        except OSError:
+            pass
+
+
+def _find_cut(samples, np) -> int:
+    """Index to split at: the quietest frame in the last few seconds before the target chunk length."""
+    target = int(settings.VOICE_CHUNK_SECONDS * SAMPLE_RATE)
+    start = max(0, target - int(settings.VOICE_SILENCE_SEARCH_SECONDS * SAMPLE_RATE))
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    frames = (target - start) // frame
+    if frames == 0:
+        return target
+    region = samples[start:start + frames * frame].reshape(frames, frame)
+    energy = np.sqrt(np.mean(region * region, axis=1))
+    return start + int(np.argmin(energy)) * frame + frame // 2
+
+
+def iter_audio_chunks(source: BinaryIO) -> Iterator["np.ndarray"]:
+    """
+    Decodes audio from a file-like object with ffmpeg and yields float32 chunks
+    of at most VOICE_CHUNK_SECONDS, split at silences. Only one chunk of decoded
+    audio is held in memory, and decoding stops at VOICE_MAX_DURATION_SECONDS.
+    """
+    import numpy as np
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is not installed; it is required to decode audio.")
+
+    command = [
+        "ffmpeg", "-i", "pipe:0",
+        "-t", str(settings.VOICE_MAX_DURATION_SECONDS),
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    feeder = threading.Thread(target=_feed, args=(source, process.stdin), daemon=True)
+    feeder.start()
+
+    target = int(settings.VOICE_CHUNK_SECONDS * SAMPLE_RATE)
+    read_bytes = int(READ_SECONDS * SAMPLE_RATE) * 2
+    buffer = np.empty(0, dtype=np.float32)
+    try:
+        while True:
+            raw = process.stdout.read(read_bytes)
+            if not raw:
+                break
+            raw = raw[:len(raw) - (len(raw) % 2)]
+            pcm = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+            buffer = np.concatenate([buffer, pcm])
+            while len(buffer) >= target:
+                cut = _find_cut(buffer, np)
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+        if len(buffer):
+            yield buffer
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        feeder.join(timeout=1.0)
+
+
+def iter_transcript(source: BinaryIO, whisper_model) -> Iterator[Transcript]:
+    """Transcribes chunk by chunk, yielding the cumulative transcript after each chunk."""
+    transcript = ""
+    seconds = 0.0
+    for chunk in iter_audio_chunks(source):
+        seconds += len(chunk) / SAMPLE_RATE
+        # The tail of the transcript so far keeps wording consistent across chunk boundaries.
+        with track_stage("whisper"):
+            result = whisper_model.transcribe(chunk, initial_prompt=transcript[-200:] or None)
+        piece = result.get("text", "").strip()
+        if piece:
+            transcript = f"{transcript} {piece}".strip()
+            yield Transcript(transcript, seconds)
+
+
+async def iter_transcript_async(source: BinaryIO) -> AsyncIterator[Transcript]:
+    """
+    Async wrapper around iter_transcript: each chunk is decoded and transcribed
+    in a worker thread. With VOICE_ANALYSIS_MIN_WORDS set, stops early once the
+    transcript reaches that many words; the last transcript is then marked
+    truncated so clients know later audio was not analyzed.
+    """
+    whisper_model = await whisper_component.get_async()
+    if whisper_model is None:
+        raise RuntimeError("Whisper model is not available.")
+
+    transcripts = iter_transcript(source, whisper_model)
+    try:
+        while True:
+            transcript = await asyncio.to_thread(next, transcripts, None)
+            if transcript is None:
+                break
+            enough = settings.VOICE_ANALYSIS_MIN_WORDS and len(transcript.text.split()) >= settings.VOICE_ANALYSIS_MIN_WORDS
+            if enough:
+                yield transcript._replace(truncated=True)
+                break
+            yield transcript
+    finally:
+        # Stops ffmpeg if we finished early. If we were cancelled mid-chunk the
+        # generator is still running in its thread and is cleaned up when collected.
+        try:
+            await asyncio.to_thread(transcripts.close)
+        except ValueError:
+            pass
+
+
+async def transcribe(source: BinaryIO) -> Transcript:
+    """Returns the (possibly partial, see iter_transcript_async) transcript of an audio file."""
+    transcript = Transcript("", 0.0)
+    async for transcript in iter_transcript_async(source):
+        pass
+    return transcript
@@ -0,0 +1,153 @@
+import copy
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from ..core.config.settings import settings
+from ..core.metrics import register_cache
+from ..database.database import database
+
+logger = logging.getLogger(__name__)
+
+
+class VerdictCache:
+    """
+    Two-tier cache of full analysis responses, keyed by a hash of the normalized text.
+
+    - memory: an in-process LRU with a per-entry TTL.
+    - shared: an optional MongoDB collection with a TTL index, so every uvicorn
+      worker can serve hits produced by the others.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, collection=None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.collection = collection
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._ttl_index_ready = False
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    # --- memory tier ---
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _memory_set(self, key: str, response: Dict[str, Any], ttl_seconds: float):
+        self._entries[key] = (time.monotonic() + ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- shared tier ---
+    async def _ensure_ttl_index(self):
+        if not self._ttl_index_ready:
+            # Documents are removed by MongoDB once `expires_at` has passed.
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self._ttl_index_ready = True
+
+    async def _shared_get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        if self.collection is None:
+            return None
+        try:
+            doc = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            self.shared_errors += 1
+            logger.warning("Verdict cache (shared) read failed: %s", e)
+            return None
+        if not doc:
+            return None
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        # The TTL monitor only runs periodically, so expired documents can still be read.
+        if remaining <= 0:
+            return None
+        return doc["response"], remaining
+
+    async def _shared_set(self, key: str, response: Dict[str, Any]):
+        if self.collection is None:
+            return
+        try:
+            await self._ensure_ttl_index()
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "response": response,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            self.shared_errors += 1
+            logger.warning("Verdict cache (shared) write failed: %s", e)
+
+    # --- public API ---
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Returns (response, tier) on a hit and (None, None) on a miss."""
+        response = self._memory_get(key)
+        if response is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return copy.deepcopy(response), "memory"
+
+        shared = await self._shared_get(key)
+        if shared is not None:
+            response, remaining = shared
+            self._memory_set(key, response, remaining)
+            self.hits += 1
+            self.shared_hits += 1
+            return copy.deepcopy(response), "shared"
+
+        self.misses += 1
+        return None, None
+
+    async def set(self, key: str, response: Dict[str, Any]):
+        """Stores a JSON-safe copy of a full analysis response."""
+        stored = jsonable_encoder(response)
+        self._memory_set(key, stored, self.ttl_seconds)
+        await self._shared_set(key, stored)
+
+    def info(self, status: str, tier: Optional[str] = None) -> Dict[str, Any]:
+        """Per-response cache block, see models.CacheInfo."""
+        return {"status": status, "tier": tier, "hits": self.hits, "misses": self.misses}
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "shared_tier": self.collection is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+verdict_cache = VerdictCache(
+    max_entries=settings.VERDICT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.VERDICT_CACHE_TTL_SECONDS,
+    collection=database.get_collection("verdict_cache") if settings.VERDICT_CACHE_SHARED else None,
+)
+register_cache("verdict", lambda: (verdict_cache.hits, verdict_cache.misses))
@@ -1,8 +1,14 @@
-import httpx
-import fitz  # PyMuPDF
-import re
-from typing import Dict, Any, List, Optional
-from ..models.models import VerificationResponseOut
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from ..core.config.settings import settings
+from ..core.metrics import track_stage
+from ..models.models import VerificationExcerpt, VerificationResponseOut
+from .passage_index import MIN_MATCHED_TERMS, SENTENCE_SPLIT, Passage, build_index, get_passage_index, index_dir, passage_index_component, tokenize
+from .pdf_store import pdf_parser, pdf_store
+
+logger = logging.getLogger(__name__)
 
 # --- MOCKED OFFICIAL PDF SOURCES ---
 # In a real-world application, this would be the result of a sophisticated web crawler
@@ -11,7 +17,7 @@ MOCKED_PDF_DATABASE = [
     {
         "title": "PIB Fact Check on Fake News Schemes",
         "url": "https://pib.gov.in/FactCheck/guide_english.pdf",
-        "keywords": ["scheme", "free", "laptop", "government", "fake"]
+        "keywords": ["scheme", "free", "laptop", "government", "fake"] # Routes queries here while the PDF is not in the store yet
     },
     {
         "title": "WHO Q&A on COVID-19 and related topics",
@@ -26,82 +32,150 @@ SUGGESTED_SOURCES_FALLBACK = [
     "https://www.who.int/emergencies/diseases/novel-coronavirus-2019/advice-for-public"
 ]
 
-async def download_and_parse_pdf(url: str) -> Dict[int, str]:
-    """Downloads a PDF from a URL and returns its text content, page by page."""
-    pdf_pages = {}
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, follow_redirects=True, timeout=20.0)
-            response.raise_for_status()
-        
-        # Open the PDF from the downloaded bytes
-        pdf_document = fitz.open(stream=response.content, filetype="pdf")
-        
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            pdf_pages[page_num + 1] = page.get_text("text") # Page numbers are 1-indexed
-            
-        pdf_document.close()
-        return pdf_pages
-    except Exception as e:
-        print(f"Failed to download or parse PDF from {url}: {e}")
-        return {}
-
-
-def find_relevant_excerpt(page_text: str, keywords: List[str]) -> Optional[str]:
-    """Finds a sentence containing the most keywords."""
-    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', page_text)
+def find_relevant_excerpt(page_text: str, query_terms: Set[str]) -> Tuple[Optional[str], int]:
+    """Finds the sentence containing the most distinct query terms, and how many it contains."""
     best_sentence = None
     max_matches = 0
 
-    for sentence in sentences:
-        matches = sum(1 for keyword in keywords if keyword in sentence.lower())
+    for sentence in SENTENCE_SPLIT.split(page_text):
+        matches = len(query_terms.intersection(tokenize(sentence)))
         if matches > max_matches:
             max_matches = matches
-            best_sentence = sentence.strip()
-            
-    # Require at least 2 keyword matches for a relevant excerpt
-    return best_sentence if max_matches >= 2 else None
+            best_sentence = " ".join(sentence.split())
+
+    # Same bar as the passage index: at least 2 query terms for a relevant excerpt
+    return (best_sentence, max_matches) if max_matches >= MIN_MATCHED_TERMS else (None, 0)
+
+
+# Documents being ingested in the background, and when ingesting one last failed.
+_ingesting: Set[str] = set()
+_ingest_failed_at: Dict[str, float] = {}
+_ingestion_tasks: Set[asyncio.Task] = set()
+_reindex_lock = asyncio.Lock()
+
+
+async def _scan_document(pdf_info: Dict[str, Any], query_terms: Set[str], slots: asyncio.Semaphore, downloaded: Dict[str, bytes]) -> Optional[Passage]:
+    """Downloads one PDF and matches its pages as the parser streams them out."""
+    try:
+        async with slots:
+            content = await pdf_store.download(pdf_info["url"])
+        downloaded[pdf_info["url"]] = content  # handed to the background ingestion
+        pages = pdf_parser.iter_pages(content)
+        try:
+            async for page_num, page_text in pages:
+                excerpt, matches = find_relevant_excerpt(page_text, query_terms)
+                if excerpt:
+                    return Passage(source=pdf_info["title"], url=pdf_info["url"], page=page_num, text=excerpt, score=float(matches))
+        finally:
+            # Stops parsing the rest of the document once we have a match.
+            await pages.aclose()
+    except Exception as e:
+        logger.error("Failed to download or parse PDF from %s: %s", pdf_info['url'], e)
+    return None
+
+
+async def _ingest_in_background(candidates: List[Dict[str, Any]], downloaded: Dict[str, bytes]):
+    """Ingests the scanned documents (reusing the bytes the scan downloaded) and rebuilds the passage index."""
+    try:
+        outcomes = await pdf_store.ingest(candidates, downloaded=downloaded)
+        for url, outcome in outcomes.items():
+            if outcome.startswith("error"):
+                _ingest_failed_at[url] = time.monotonic()
+        if any(outcome == "updated" for outcome in outcomes.values()):
+            async with _reindex_lock:
+                await asyncio.to_thread(build_index, pdf_store, index_dir())
+            passage_index_component.reset()
+    except Exception as e:
+        logger.error("Background ingestion of %d PDF(s) failed: %s", len(candidates), e)
+    finally:
+        _ingesting.difference_update(pdf["url"] for pdf in candidates)
+
+
+def _schedule_ingestion(candidates: List[Dict[str, Any]], downloaded: Dict[str, bytes]):
+    candidates = [pdf for pdf in candidates if pdf["url"] not in _ingesting]
+    if not candidates:
+        return
+    _ingesting.update(pdf["url"] for pdf in candidates)
+    task = asyncio.ensure_future(_ingest_in_background(candidates, downloaded))
+    _ingestion_tasks.add(task)
+    task.add_done_callback(_ingestion_tasks.discard)
+
+
+async def _search_missing_documents(query: str) -> Optional[Passage]:
+    """
+    Fallback for relevant PDFs that have not been ingested yet: downloads and
+    parses them concurrently and returns the first match, cancelling the
+    downloads and parses still in progress. Whatever was downloaded is then
+    ingested and indexed in the background, off the request path, so later
+    requests find it in the passage index instead of fetching it again.
+    """
+    query_terms = set(tokenize(query))
+    if len(query_terms) < MIN_MATCHED_TERMS:
+        return None
+    retry_after = time.monotonic() - settings.VERIFICATION_FETCH_RETRY_SECONDS
+    candidates = [
+        pdf for pdf in MOCKED_PDF_DATABASE
+        if pdf["url"].lower().endswith(".pdf")
+        and pdf["url"] not in _ingesting
+        and not pdf_store.has(pdf["url"])
+        and _ingest_failed_at.get(pdf["url"], float("-inf")) < retry_after
+        and any(kw in query.lower() for kw in pdf["keywords"])
+    ]
+    if not candidates:
+        return None
+
+    logger.info("Scanning %d PDF(s) that are not in the store yet.", len(candidates))
+    slots = asyncio.Semaphore(settings.PDF_FETCH_CONCURRENCY)
+    downloaded: Dict[str, bytes] = {}
+    tasks = [asyncio.create_task(_scan_document(pdf, query_terms, slots, downloaded)) for pdf in candidates]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            passage = await finished
+            if passage is not None:
+                return passage
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Documents whose download was cancelled are fetched by the ingestion itself.
+        _schedule_ingestion(candidates, downloaded)
+    return None
 
 
 async def verify_query_against_pdfs(query: str) -> VerificationResponseOut:
     """
     Main service function to orchestrate the PDF verification process.
     """
-    query_keywords = [word for word in query.lower().split() if len(word) > 3]
-
-    # 1. Find potentially relevant PDFs (simulated)
-    relevant_pdfs = [
-        pdf for pdf in MOCKED_PDF_DATABASE 
-        if any(kw in query.lower() for kw in pdf["keywords"])
-    ]
+    # 1. Score every sentence-level passage of the ingested corpus with BM25
+    index = await get_passage_index()
+    with track_stage("passage_search"):
+        passages = index.search(query, settings.VERIFICATION_TOP_K) if index is not None else []
+    if not passages and settings.VERIFICATION_FETCH_MISSING:
+        with track_stage("pdf_fallback"):
+            passage = await _search_missing_documents(query)
+        passages = [passage] if passage is not None else []
 
-    # 2. Iterate through relevant PDFs and search for the claim
-    for pdf_info in relevant_pdfs:
-        if not pdf_info["url"].endswith(".pdf"):
-            continue # Skip non-PDF sources for direct parsing
-
-        print(f"Analyzing PDF: {pdf_info['title']}")
-        pdf_content = await download_and_parse_pdf(pdf_info["url"])
-
-        for page_num, page_text in pdf_content.items():
-            excerpt = find_relevant_excerpt(page_text, query_keywords)
-            if excerpt:
-                # --- VERIFICATION FOUND ---
-                summary = f"Information related to the query was found in an official document. The claim appears to be addressed on page {page_num}."
-                # A more advanced version would analyze the sentiment of the excerpt to determine true/false
-                return VerificationResponseOut(
-                    query=query,
-                    verified="unknown", # Setting to "unknown" as sentiment analysis isn't implemented
-                    source=pdf_info["title"],
-                    page=page_num,
-                    excerpt=excerpt,
-                    summary=summary
-                )
+    # 2. Report the best passage, plus the runners-up
+    if passages:
+        best = passages[0]
+        # --- VERIFICATION FOUND ---
+        summary = f"Information related to the query was found in an official document. The claim appears to be addressed on page {best.page}."
+        # A more advanced version would analyze the sentiment of the excerpt to determine true/false
+        return VerificationResponseOut(
+            query=query,
+            verified="unknown", # Setting to "unknown" as sentiment analysis isn't implemented
+            source=best.source,
+            page=best.page,
+            excerpt=best.text,
+            summary=summary,
+            excerpts=[
+                VerificationExcerpt(source=p.source, url=p.url, page=p.page, excerpt=p.text, score=round(p.score, 4))
+                for p in passages
+            ],
+        )
 
     # --- 3. FALLBACK STRATEGY ---
     # If no information is found in any of the PDFs
-    print("Could not verify claim in available PDFs. Providing fallback sources.")
+    logger.info("Could not verify claim in available PDFs. Providing fallback sources.")
     return VerificationResponseOut(
         query=query,
         verified="unknown",
@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..core.config.settings import settings
+from ..core.metrics import register_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "articles"
+
+# Query parameters that only track where a click came from.
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref_src", "_ga"}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def strip_tracking_params(url: str) -> str:
+    """The URL without tracking parameters; everything else (order, encoding) is left exactly as given."""
+    parts = urlsplit(url.strip())
+    if not parts.query:
+        return urlunsplit(parts)
+    kept = [pair for pair in parts.query.split("&") if not _is_tracking_param(pair.split("=", 1)[0])]
+    return urlunsplit(parts._replace(query="&".join(kept)))
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL so tracking parameters and cosmetic differences
+    don't split the cache. Only a cache key: it is not safe to fetch, since
+    re-encoding and sorting the query can change what the server sees.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ]
+    query.sort()
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def freshness_seconds(headers) -> Optional[float]:
+    """
+    How long a response may be served without revalidation, from Cache-Control
+    (falling back to the configured default). None means "don't store it".
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return float(match.group(1))
+    return float(settings.ARTICLE_CACHE_TTL_SECONDS)
+
+
+class ArticleCache:
+    """
+    URL -> extracted article text, stored as one small JSON file per URL with
+    the validators (ETag / Last-Modified) needed for conditional GETs.
+
+    A file's mtime is its last use (reads touch it). After writes, at most
+    once per `prune_interval` seconds, entries expired for `prune_after`
+    seconds are deleted and the least recently used ones are evicted until
+    the cache is within `max_entries` and `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_entries: int, max_bytes: int, prune_after: float, prune_interval: float):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self.prune_after = prune_after
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._pruning = False
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.expired_pruned = 0
+        self.evicted = 0
+
+    def _path(self, normalized_url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(normalized_url.encode('utf-8')).hexdigest()}.json"
+
+    def _read(self, normalized_url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(normalized_url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != normalized_url:
+            return None
+        try:
+            os.utime(self._path(normalized_url))  # recently used, evicted last
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, entry: Dict[str, Any]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(entry["url"])
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+
+    def _remove(self, path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False  # another worker got there first
+
+    def _prune(self):
+        """Deletes long-expired entries, then evicts by least recent use down to the caps."""
+        now = time.time()
+        entries: List[Tuple[float, int, Path]] = []
+        try:
+            scan = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for item in scan:
+            try:
+                info = item.stat()
+            except OSError:
+                continue
+            path = Path(item.path)
+            if not item.name.endswith(".json"):
+                if item.name.endswith(".tmp") and now - info.st_mtime > self.prune_after:
+                    self._remove(path)  # left behind by a worker that died mid-write
+                continue
+            # Only entries unused for prune_after can have expired that long ago; read just those.
+            if now - info.st_mtime > self.prune_after:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        expires_at = json.load(f).get("expires_at", 0)
+                except (OSError, ValueError):
+                    expires_at = 0
+                if now - expires_at > self.prune_after:
+                    self.expired_pruned += self._remove(path)
+                    continue
+            entries.append((info.st_mtime, info.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        excess = len(entries) - self.max_entries
+        if excess <= 0 and total_bytes <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if excess <= 0 and total_bytes <= self.max_bytes:
+                break
+            self.evicted += self._remove(path)
+            excess -= 1
+            total_bytes -= size
+
+    async def _maybe_prune(self):
+        now = time.monotonic()
+        if self._pruning or now - self._last_prune < self.prune_interval:
+            return
+        self._pruning = True
+        self._last_prune = now
+        try:
+            await asyncio.to_thread(self._prune)
+        except Exception as e:
+            logger.warning("Article cache pruning failed: %s", e)
+        finally:
+            self._pruning = False
+
+    async def get(self, normalized_url: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, normalized_url)
+
+    async def put(self, normalized_url: str, text: str, headers, fresh_for: float):
+        entry = {
+            "url": normalized_url,
+            "text": text,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "expires_at": time.time() + fresh_for,
+        }
+        try:
+            await asyncio.to_thread(self._write, entry)
+        except OSError as e:
+            logger.warning("Could not write article cache entry for %s: %s", normalized_url, e)
+        await self._maybe_prune()
+
+    async def refresh(self, entry: Dict[str, Any], headers, fresh_for: float):
+        """Extends an entry after a 304, picking up any updated validators."""
+        entry = dict(entry)
+        entry["etag"] = headers.get("etag") or entry.get("etag")
+        entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+        entry["expires_at"] = time.time() + fresh_for
+        try:
+            await asyncio.to_thread(self._write, entry)
+        except OSError as e:
+            logger.warning("Could not refresh article cache entry for %s: %s", entry['url'], e)
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        return entry.get("expires_at", 0) > time.time()
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.fresh_hits + self.revalidated + self.misses
+        return {
+            "directory": str(self.directory),
+            "fresh_hits": self.fresh_hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": round((self.fresh_hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "expired_pruned": self.expired_pruned,
+            "evicted": self.evicted,
+        }
+
+
+article_cache = ArticleCache(
+    Path(settings.ARTICLE_CACHE_DIR) if settings.ARTICLE_CACHE_DIR else DEFAULT_CACHE_DIR,
+    max_entries=settings.ARTICLE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.ARTICLE_CACHE_MAX_BYTES,
+    prune_after=settings.ARTICLE_CACHE_PRUNE_AFTER_SECONDS,
+    prune_interval=settings.ARTICLE_CACHE_PRUNE_INTERVAL_SECONDS,
+)
+register_cache("article", lambda: (article_cache.fresh_hits + article_cache.revalidated, article_cache.misses))
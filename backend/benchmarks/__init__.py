@@ -0,0 +1,9 @@
+"""
+Offline benchmarks for the backend. Run from the backend directory:
+
+    python -m benchmarks.micro                  # hot functions, in-process
+    python -m benchmarks.load --duration 60     # the API under load, against local stubs
+
+Both accept --save-baseline to record the run in benchmarks/baselines/ and
+--compare to fail (exit code 1) when a result regressed past --tolerance.
+"""
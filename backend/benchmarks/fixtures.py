@@ -0,0 +1,149 @@
+"""
+Deterministic inputs for the benchmarks: news-like text of any length, the
+saved article page, rendered text images and the verification PDFs.
+"""
+import io
+import random
+from pathlib import Path
+from typing import List, Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+ARTICLE_HTML_PATH = FIXTURES_DIR / "article.html"
+
+SUBJECTS = [
+    "The health ministry", "A viral message", "State officials", "The central bank", "Local police",
+    "A government spokesperson", "Researchers at the university", "The election commission",
+    "A widely shared video", "The fact-check unit",
+]
+VERBS = [
+    "denied reports that", "confirmed on Monday that", "warned residents that", "said in a statement that",
+    "clarified that", "announced that", "dismissed claims that", "is investigating whether",
+]
+CLAIMS = [
+    "every student will receive a free laptop under a new government scheme",
+    "the covid vaccine changes human DNA",
+    "wearing a mask lowers oxygen levels in healthy adults",
+    "the old currency notes will stop being legal tender next week",
+    "drinking hot water cures the virus",
+    "a new scheme pays unemployed youth a monthly allowance",
+    "bank accounts without a linked phone number will be frozen",
+    "the government is giving away free solar panels to farmers",
+    "polling dates have been moved because of the heatwave",
+    "the vaccine is no longer required for international travel",
+]
+DETAILS = [
+    "The message has been forwarded thousands of times on messaging apps.",
+    "No official notification has been issued on the matter.",
+    "Officials urged people not to share unverified links.",
+    "The claim first appeared on a website imitating a government portal.",
+    "Experts said the numbers quoted in the post could not be traced to any official source.",
+    "A press release on the ministry's website contradicts the claim.",
+    "Similar posts circulated last year and were debunked at the time.",
+    "The department said it would take legal action against those spreading the rumour.",
+]
+
+# Claims sent to /verify-claim-pdf; each shares at least two terms with the generated PDFs.
+VERIFICATION_CLAIMS = [
+    "Is the free laptop scheme from the government real?",
+    "Government scheme giving free laptops to students",
+    "Does the covid vaccine change DNA?",
+    "Do masks lower oxygen levels during the covid pandemic?",
+    "Fake government scheme asking for bank details",
+    "Is there a vaccine for the new virus variant?",
+]
+
+# One document per PDF in MOCKED_PDF_DATABASE, matched by file name.
+VERIFICATION_PAGES = [
+    "The Fact Check Unit reviews claims about government schemes that circulate on social media. "
+    "Messages promising a free laptop to every student under a government scheme are fake. "
+    "No ministry collects bank details through forwarded links; report such websites to the cyber crime helpline.",
+    "Official schemes are announced through press releases and the ministry portals. "
+    "Citizens should verify any scheme before sharing personal information. "
+    "Covid vaccines approved by the regulator do not change human DNA and are safe for adults.",
+    "Wearing a mask does not lower oxygen levels in healthy adults. "
+    "The virus spreads mainly through droplets; vaccination and masks reduce transmission.",
+]
+
+
+def news_text(length: int, seed: int = 0) -> str:
+    """News-like prose of about `length` characters, the same for the same seed."""
+    rng = random.Random(seed)
+    sentences: List[str] = []
+    size = 0
+    while size < length:
+        if rng.random() < 0.6:
+            sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(CLAIMS)}."
+        else:
+            sentence = rng.choice(DETAILS)
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)[:max(length, 1)]
+
+
+def page_text(length: int, seed: int = 0, needle: Optional[str] = None) -> str:
+    """A PDF-page-sized block of prose, with `needle` placed near the end when given."""
+    text = news_text(length, seed)
+    if needle is None:
+        return text
+    cut = text.rfind(". ", 0, int(len(text) * 0.9))
+    return f"{text[:cut + 2]}{needle} {text[cut + 2:]}" if cut >= 0 else f"{text} {needle}"
+
+
+def article_html() -> bytes:
+    return ARTICLE_HTML_PATH.read_bytes()
+
+
+def scaled_article_html(paragraph_copies: int) -> bytes:
+    """The saved article with its body repeated, for long-page extraction timings."""
+    html = ARTICLE_HTML_PATH.read_text(encoding="utf-8")
+    start, end = html.index("        <p>"), html.index("        <div class=\"share\">")
+    return (html[:start] + html[start:end] * paragraph_copies + html[end:]).encode("utf-8")
+
+
+def text_image(width: int, height: int, text: str, seed: int = 0) -> bytes:
+    """A PNG of dark text on a slightly noisy light background, like a screenshot of a post."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (245, 245, 240))
+    draw = ImageDraw.Draw(image)
+    for _ in range(width * height // 400):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.point((x, y), fill=(225, 225, 220))
+    try:
+        font = ImageFont.load_default(size=max(12, height // 30))
+    except TypeError:  # Pillow < 10.1
+        font = ImageFont.load_default()
+    margin = width // 20
+    line_height = max(16, height // 22)
+    words = text.split()
+    y = margin
+    line = ""
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if draw.textlength(candidate, font=font) > width - 2 * margin and line:
+            draw.text((margin, y), line, fill=(20, 20, 20), font=font)
+            y += line_height
+            line = word
+            if y > height - margin - line_height:
+                break
+        else:
+            line = candidate
+    if line and y <= height - margin - line_height:
+        draw.text((margin, y), line, fill=(20, 20, 20), font=font)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def write_pdf(path: Path, pages: List[str]):
+    """Writes a text PDF with one page per string (PyMuPDF)."""
+    import fitz
+
+    document = fitz.open()
+    for text in pages:
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(56, 56, page.rect.width - 56, page.rect.height - 56), text, fontsize=11)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document.save(str(path))
+    document.close()
@@ -0,0 +1,284 @@
+"""
+End-to-end load harness: drives /analysis, /analyze-url and /verify-claim-pdf
+on a real uvicorn process whose upstreams are the local stubs
+(benchmarks.stubs), and reports throughput and p50/p95/p99 per endpoint.
+
+    python -m benchmarks.load --duration 60 --concurrency 32
+    python -m benchmarks.load --latency openai=2000 --error-rate x=0.1 --compare
+
+What the harness sets up, in a temporary directory:
+- the stub server (OpenAI, X, Reddit, article hosts) with the requested latency/errors
+- a PDF store and passage index built from generated copies of the verification PDFs
+- the app, pointed at the stubs through X_API_BASE_URL / REDDIT_API_BASE_URL /
+  OPENAI_BASE_URL, with its article cache in the temp directory and
+  VERIFICATION_FETCH_MISSING off, so nothing leaves the machine
+
+MongoDB is not started: none of the driven endpoints touch it, and
+MONGO_DETAILS points at a closed local port so an accidental use fails fast.
+Pass --app-env KEY=VALUE to override any other setting (e.g. the X rate limits).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from . import fixtures
+from .report import add_baseline_arguments, build_report, finish, summarize
+from .stubs import add_fault_arguments
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+API = "/api/v1"
+ENDPOINTS = ("analysis", "analyze-url", "verify-claim-pdf")
+DEFAULT_MIX = {"analysis": 5.0, "analyze-url": 3.0, "verify-claim-pdf": 2.0}
+FILLER_PAGES = 20  # extra pages per generated PDF, so the index isn't trivially small
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _parse_mix(values: List[str]) -> Dict[str, float]:
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        name, sep, weight = value.partition("=")
+        if not sep or name not in ENDPOINTS:
+            raise SystemExit(f"--mix expects ENDPOINT=WEIGHT with ENDPOINT in {', '.join(ENDPOINTS)}, got {value!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def _parse_env(values: List[str]) -> Dict[str, str]:
+    env = {}
+    for value in values:
+        key, sep, setting = value.partition("=")
+        if not sep:
+            raise SystemExit(f"--app-env expects KEY=VALUE, got {value!r}")
+        env[key] = setting
+    return env
+
+
+def _wait_for(url: str, timeout: float, process: subprocess.Popen) -> Optional[int]:
+    """Polls url until it answers 200; returns the last status seen (None if it never answered)."""
+    deadline = time.monotonic() + timeout
+    status = None
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{' '.join(process.args)} exited with code {process.returncode}")
+        try:
+            status = httpx.get(url, timeout=2.0).status_code
+            if status == 200:
+                return status
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    return status
+
+
+def _stop(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# --- Setup ---
+
+def prepare_pdf_store(workdir: Path, env: Dict[str, str]) -> bool:
+    """Writes local copies of the verification PDFs and ingests them with the store's own CLI."""
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        print("PyMuPDF is not installed; skipping /verify-claim-pdf.", file=sys.stderr)
+        return False
+    from app.services.verification_services import MOCKED_PDF_DATABASE
+
+    pdf_dir = workdir / "pdfs"
+    for i, doc in enumerate(MOCKED_PDF_DATABASE):
+        if not doc["url"].lower().endswith(".pdf"):
+            continue
+        filler = [fixtures.news_text(2_500, seed=i * 1000 + page) for page in range(FILLER_PAGES)]
+        fixtures.write_pdf(pdf_dir / Path(doc["url"]).name, fixtures.VERIFICATION_PAGES + filler)
+    result = subprocess.run(
+        [sys.executable, "-m", "app.services.pdf_store", "--from-dir", str(pdf_dir)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(f"Building the PDF store failed; skipping /verify-claim-pdf.\n{result.stderr}", file=sys.stderr)
+        return False
+    return True
+
+
+def app_environment(workdir: Path, stub_url: str, overrides: Dict[str, str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "X_API_BASE_URL": f"{stub_url}/x/2/",
+        "REDDIT_API_BASE_URL": f"{stub_url}/reddit/",
+        "OPENAI_BASE_URL": f"{stub_url}/openai/v1",
+        "GEMINI_API_KEY": "sk-benchmark",
+        "X_BEARER_TOKEN": "benchmark",
+        "MONGO_DETAILS": f"mongodb://127.0.0.1:{_free_port()}/?serverSelectionTimeoutMS=500",
+        "ARTICLE_CACHE_DIR": str(workdir / "articles"),
+        "PDF_STORE_DIR": str(workdir / "pdf_store"),
+        "PASSAGE_INDEX_DIR": str(workdir / "passage_index"),
+        "VERIFICATION_FETCH_MISSING": "false",
+        "WARMUP_COMPONENTS": json.dumps(["ml_model", "openai", "passage_index"]),
+        "LOG_LEVEL": "WARNING",
+    })
+    env.update(overrides)
+    return env
+
+
+# --- Load generation ---
+
+class Workload:
+    """Builds requests for each endpoint from a fixed pool of inputs (or unique ones when distinct == 0)."""
+
+    def __init__(self, stub_url: str, distinct: int, seed: int):
+        self.stub_url = stub_url
+        self.distinct = distinct
+        self.rng = random.Random(seed)
+        self.counter = 0
+
+    def _key(self) -> int:
+        self.counter += 1
+        return self.counter if self.distinct <= 0 else self.rng.randrange(self.distinct)
+
+    def request(self, endpoint: str) -> Tuple[str, Dict[str, Any]]:
+        key = self._key()
+        if endpoint == "analysis":
+            length = 200 + (key * 7919) % 2800
+            return f"{API}/analysis", {"text": fixtures.news_text(length, seed=key)}
+        if endpoint == "analyze-url":
+            return f"{API}/analyze-url", {"url": f"{self.stub_url}/articles/story-{key}"}
+        claims = fixtures.VERIFICATION_CLAIMS
+        claim = claims[key % len(claims)]
+        return f"{API}/verify-claim-pdf", {"query": claim if self.distinct > 0 else f"{claim} (#{key})"}
+
+
+async def run_load(app_url: str, workload: Workload, mix: Dict[str, float], concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    """Closed loop: `concurrency` clients send requests back to back; only the ones started after warm-up are recorded."""
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    status_counts: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=60.0, limits=limits) as client:
+        loop = asyncio.get_running_loop()
+        measure_from = loop.time() + warmup
+        stop_at = measure_from + duration
+
+        async def worker():
+            while loop.time() < stop_at:
+                endpoint = workload.rng.choices(names, weights)[0]
+                path, body = workload.request(endpoint)
+                started = loop.time()
+                try:
+                    response = await client.post(path, json=body)
+                    status = str(response.status_code)
+                    ok = response.is_success
+                except httpx.HTTPError as e:
+                    status, ok = type(e).__name__, False
+                if started < measure_from:
+                    continue
+                latencies[endpoint].append(loop.time() - started)
+                status_counts[endpoint][status] = status_counts[endpoint].get(status, 0) + 1
+                if not ok:
+                    errors[endpoint] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    results = {f"POST {API}/{name}": summarize(latencies[name], duration, errors[name]) for name in names}
+    results["all"] = summarize([v for name in names for v in latencies[name]], duration, sum(errors.values()))
+    return {"results": results, "status_counts": status_counts}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API against local upstream stubs.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (default 30).")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unrecorded seconds of load first (default 5).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default 16).")
+    parser.add_argument("--mix", action="append", default=[], metavar="ENDPOINT=WEIGHT", help="Request mix (default: analysis=5 analyze-url=3 verify-claim-pdf=2).")
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct texts/URLs/claims drawn from; 0 makes every request unique (default 500).")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the app (default 1).")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="Extra app settings.")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="Seconds to wait for /ready (default 120).")
+    add_fault_arguments(parser)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url, app_url = f"http://127.0.0.1:{stub_port}", f"http://127.0.0.1:{app_port}"
+    stub_args = ["--port", str(stub_port), "--jitter", str(args.jitter), "--error-status", str(args.error_status), "--seed", str(args.seed)]
+    for value in args.latency:
+        stub_args += ["--latency", value]
+    for value in args.error_rate:
+        stub_args += ["--error-rate", value]
+
+    stubs = app = None
+    with tempfile.TemporaryDirectory(prefix="backend-bench-") as tmp:
+        workdir = Path(tmp)
+        try:
+            stubs = subprocess.Popen([sys.executable, "-m", "benchmarks.stubs", *stub_args], cwd=BACKEND_DIR)
+            if _wait_for(f"{stub_url}/health", 30, stubs) != 200:
+                raise SystemExit("The stub server did not start.")
+
+            env = app_environment(workdir, stub_url, _parse_env(args.app_env))
+            # prepare_pdf_store imports the app, whose settings must match the server's.
+            os.environ.update(env)
+            if "verify-claim-pdf" in mix and not prepare_pdf_store(workdir, env):
+                del mix["verify-claim-pdf"]
+            if not mix:
+                raise SystemExit("Nothing left to benchmark.")
+
+            app = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                 "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+                cwd=BACKEND_DIR, env=env,
+            )
+            if _wait_for(f"{app_url}/", 60, app) != 200:
+                raise SystemExit("The app did not start.")
+            if _wait_for(f"{app_url}/ready", args.ready_timeout, app) != 200:
+                print("Warning: /ready is still failing (ML model not loaded?); measuring anyway.", file=sys.stderr)
+
+            print(f"Running {args.warmup:.0f}s warm-up + {args.duration:.0f}s at concurrency {args.concurrency} ...", file=sys.stderr)
+            workload = Workload(stub_url, args.distinct, args.seed)
+            outcome = asyncio.run(run_load(app_url, workload, mix, args.concurrency, args.duration, args.warmup))
+            upstream_calls = httpx.get(f"{stub_url}/stats").json()
+            app_stats = httpx.get(f"{app_url}{API}/analysis/stats").json()
+        finally:
+            _stop(app)
+            _stop(stubs)
+
+    config = {
+        "duration": args.duration, "warmup": args.warmup, "concurrency": args.concurrency, "mix": mix,
+        "distinct": args.distinct, "workers": args.workers, "app_env": args.app_env,
+        "latency": args.latency, "error_rate": args.error_rate, "jitter": args.jitter, "seed": args.seed,
+    }
+    report = build_report("load", outcome["results"], config)
+    report["status_counts"] = outcome["status_counts"]
+    report["upstream_calls"] = upstream_calls
+    report["app_stats"] = app_stats
+    return finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
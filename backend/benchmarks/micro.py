@@ -0,0 +1,194 @@
+"""
+Micro-benchmarks of the CPU-bound hot paths, run in-process:
+
+- ml_model.predict at several text lengths (and one predict_batch)
+- PassageIndex.search (what /verify-claim-pdf runs) on indexes of growing size
+- find_relevant_excerpt on large PDF pages (the missing-document fallback)
+- article extraction (the parse step of fetch_article_text_from_url) on the saved page
+- OCR preprocessing and tesseract on rendered text images
+
+    python -m benchmarks.micro [--only predict] [--min-time 2] [--save-baseline | --compare]
+
+Benchmarks whose dependencies are missing (model files, Pillow, tesseract)
+are reported as skipped rather than failing the run.
+"""
+import argparse
+import atexit
+import hashlib
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import fixtures
+from .report import add_baseline_arguments, build_report, finish, summarize
+
+PREDICT_LENGTHS = (100, 1_000, 10_000, 50_000)
+SEARCH_DOCUMENTS = (10, 100, 500)    # documents of SEARCH_PAGES pages each
+SEARCH_PAGES = 20
+SEARCH_PAGE_LENGTH = 3_000
+EXCERPT_PAGE_LENGTHS = (5_000, 50_000, 500_000)
+EXCERPT_QUERY = "Is the free laptop scheme from the government real?"
+ARTICLE_COPIES = (1, 50)
+OCR_SIZES = ((800, 600), (1600, 1200))
+
+
+class Skip(Exception):
+    """A benchmark can't run in this environment."""
+
+
+def time_case(fn: Callable[[], Any], min_time: float, min_runs: int, warmup: int) -> Dict[str, Any]:
+    """Calls fn until both min_time seconds and min_runs calls have passed, timing each call."""
+    for _ in range(warmup):
+        fn()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    while len(latencies) < min_runs or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies)
+
+
+# --- Cases: each returns [(name, callable)] or raises Skip ---
+
+def predict_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    from app.core import ml_model
+
+    if not ml_model.load_components():
+        raise Skip(f"ML model not available ({ml_model.ml_component.error})")
+    cases = []
+    for length in PREDICT_LENGTHS:
+        text = fixtures.news_text(length, seed=length)
+        cases.append((f"ml.predict[{length} chars]", lambda text=text: ml_model.predict(text)))
+    batch = [fixtures.news_text(1_000, seed=i) for i in range(32)]
+    cases.append(("ml.predict_batch[32 x 1000 chars]", lambda: ml_model.predict_batch(batch)))
+    return cases
+
+
+def _build_search_index(documents: int, workdir: Path):
+    """Builds a passage index over `documents` synthetic PDFs, with the verification pages spread among them."""
+    from app.services.passage_index import PassageIndex, build_index
+    from app.services.pdf_store import PdfStore
+
+    store = PdfStore(workdir / f"store-{documents}")
+    for doc in range(documents):
+        pages = [fixtures.page_text(SEARCH_PAGE_LENGTH, seed=doc * SEARCH_PAGES + page) for page in range(SEARCH_PAGES)]
+        pages[doc % SEARCH_PAGES] += " " + fixtures.VERIFICATION_PAGES[doc % len(fixtures.VERIFICATION_PAGES)]
+        content_hash = hashlib.sha256(f"benchmark-{doc}".encode("utf-8")).hexdigest()
+        store._write_pages(content_hash, pages)
+        url = f"https://example.org/doc-{doc}.pdf"
+        store._save_entry(url, {"title": f"Document {doc}", "sha256": content_hash, "pages": len(pages), "origin": url, "ingested_at": 0.0})
+    return PassageIndex(build_index(store, workdir / f"index-{documents}"))
+
+
+def search_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise Skip("numpy is not installed")
+    from app.core.config.settings import settings
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-passage-index-"))
+    atexit.register(shutil.rmtree, workdir, True)
+    top_k = settings.VERIFICATION_TOP_K
+    cases = []
+    for documents in SEARCH_DOCUMENTS:
+        print(f"building a {documents}-document passage index ...", file=sys.stderr)
+        index = _build_search_index(documents, workdir)
+        passages = index.stats()["passages"]
+
+        def search_all(index=index):
+            for claim in fixtures.VERIFICATION_CLAIMS:
+                index.search(claim, top_k)
+
+        cases.append((f"passage_index.search[{documents} docs, {passages} passages, {len(fixtures.VERIFICATION_CLAIMS)} claims]", search_all))
+    return cases
+
+
+def excerpt_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    from app.services.passage_index import tokenize
+    from app.services.verification_services import find_relevant_excerpt
+
+    query_terms = set(tokenize(EXCERPT_QUERY))
+    needle = fixtures.VERIFICATION_PAGES[0].split(". ")[1] + "."
+    cases = []
+    for length in EXCERPT_PAGE_LENGTHS:
+        page = fixtures.page_text(length, seed=length, needle=needle)
+        cases.append((f"find_relevant_excerpt[{length} chars]", lambda page=page: find_relevant_excerpt(page, query_terms)))
+    return cases
+
+
+def article_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    from app.utils.helpers import extract_article_text
+
+    cases = []
+    for copies in ARTICLE_COPIES:
+        html = fixtures.scaled_article_html(copies)
+        cases.append((f"extract_article_text[{len(html) // 1024} KiB]", lambda html=html: extract_article_text(html, "utf-8")))
+    return cases
+
+
+def ocr_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        raise Skip("Pillow is not installed")
+    from app.core.config.settings import settings
+    from app.services.ocr_service import _ocr_worker, preprocess_image
+
+    dpi, max_dimension = settings.OCR_TARGET_DPI, settings.OCR_MAX_DIMENSION
+    text = fixtures.news_text(600, seed=3)
+    images = [(f"{w}x{h}", fixtures.text_image(w, h, text)) for w, h in OCR_SIZES]
+    cases = [(f"ocr.preprocess[{size}]", lambda image=image: preprocess_image(image, dpi, max_dimension)) for size, image in images]
+    if shutil.which("tesseract") is None:
+        cases.append(("ocr.tesseract", None))  # reported as skipped
+    else:
+        cases += [(f"ocr.tesseract[{size}]", lambda image=image: _ocr_worker(image, dpi, max_dimension)) for size, image in images]
+    return cases
+
+
+GROUPS = {
+    "predict": predict_cases,
+    "search": search_cases,
+    "excerpt": excerpt_cases,
+    "article": article_cases,
+    "ocr": ocr_cases,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the backend's hot paths.")
+    parser.add_argument("--only", action="append", choices=sorted(GROUPS), help="Run only these groups (repeatable).")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend on each benchmark (default 1).")
+    parser.add_argument("--min-runs", type=int, default=5, help="Calls per benchmark at least (default 5).")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed calls before each benchmark (default 2).")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    # Keep the app's own logging out of the timings and the table.
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for group in args.only or GROUPS:
+        try:
+            cases = GROUPS[group]()
+        except Skip as e:
+            results[group] = {"skipped": str(e)}
+            continue
+        for name, fn in cases:
+            if fn is None:
+                results[name] = {"skipped": "not available in this environment"}
+                continue
+            print(f"running {name} ...", file=sys.stderr)
+            results[name] = time_case(fn, args.min_time, args.min_runs, args.warmup)
+
+    config = {"min_time": args.min_time, "min_runs": args.min_runs, "warmup": args.warmup, "groups": args.only or sorted(GROUPS)}
+    return finish(build_report("micro", results, config), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Latency summaries, result files and baseline comparison shared by the
+micro-benchmarks and the load harness.
+"""
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linear interpolation between closest ranks; `sorted_values` must be sorted."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], elapsed: Optional[float] = None, errors: int = 0) -> Dict[str, Any]:
+    """
+    Latencies in seconds -> count, errors, throughput and mean/p50/p95/p99 in
+    milliseconds. Throughput is per second of `elapsed` wall time, or of
+    summed latency when the samples ran back to back.
+    """
+    values = sorted(latencies)
+    elapsed = elapsed if elapsed is not None else sum(values)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "throughput_per_sec": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(values, pct) * 1000, 3)
+    summary["max_ms"] = round(values[-1] * 1000, 3) if values else 0.0
+    return summary
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def build_report(suite: str, results: Dict[str, Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "suite": suite,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "config": config,
+        "results": results,
+    }
+
+
+def print_table(results: Dict[str, Dict[str, Any]]):
+    header = f"{'benchmark':<40} {'count':>7} {'errors':>6} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        if r.get("skipped"):
+            print(f"{name:<40} skipped: {r['skipped']}")
+            continue
+        print(
+            f"{name:<40} {r['count']:>7} {r['errors']:>6} {r['throughput_per_sec']:>9.1f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+        )
+
+
+def baseline_path(suite: str, name: Optional[str] = None) -> Path:
+    return BASELINE_DIR / f"{name or suite}.json"
+
+
+def save_report(report: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_report(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`: p50/p95 latencies more than
+    `tolerance` (a fraction) slower, throughput more than `tolerance` lower,
+    or a higher error share. Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or now.get("skipped") or before.get("skipped"):
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if before[key] > 0 and now[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {before[key]:.2f} -> {now[key]:.2f}")
+        if before["throughput_per_sec"] > 0 and now["throughput_per_sec"] < before["throughput_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_per_sec']:.1f}/s -> {now['throughput_per_sec']:.1f}/s")
+        error_share = now["errors"] / now["count"] if now["count"] else 0.0
+        baseline_share = before["errors"] / before["count"] if before["count"] else 0.0
+        if error_share > baseline_share + tolerance / 10:
+            regressions.append(f"{name}: error share {baseline_share:.1%} -> {error_share:.1%}")
+    return regressions
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument("--output", type=Path, help="Also write the full report to this JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline; exit 1 on regressions.")
+    parser.add_argument("--baseline-name", help="Baseline file name under benchmarks/baselines/ (default: the suite name).")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a result counts as a regression (default 0.2 = 20%%).")
+
+
+def finish(report: Dict[str, Any], args) -> int:
+    """
+    Prints, saves and compares a report according to the baseline arguments.
+    Returns the exit code: 1 on regressions, 2 when --compare finds no baseline.
+    """
+    print_table(report["results"])
+    if args.output:
+        save_report(report, args.output)
+    path = baseline_path(report["suite"], args.baseline_name)
+    exit_code = 0
+    if args.compare:
+        baseline = load_report(path)
+        if baseline is None:
+            # Not a pass: a comparison that compared nothing must not look green in CI.
+            print(f"\nNo baseline at {path}; record one on the reference machine with --save-baseline.")
+            exit_code = 2
+        else:
+            regressions = compare(report, baseline, args.tolerance)
+            if regressions:
+                print(f"\n{len(regressions)} regression(s) against {path.name} (tolerance {args.tolerance:.0%}):")
+                for line in regressions:
+                    print(f"  {line}")
+                exit_code = 1
+            else:
+                print(f"\nNo regressions against {path.name} (tolerance {args.tolerance:.0%}).")
+    if args.save_baseline:
+        save_report(report, path)
+        print(f"Baseline saved to {path}")
+    return exit_code
@@ -0,0 +1,175 @@
+"""
+Local stand-ins for the upstreams the API calls, with injected latency and
+errors. One server hosts all of them under a path prefix:
+
+    POST /openai/v1/chat/completions     OpenAI chat completions (JSON verdicts)
+    GET  /x/2/tweets/search/recent       X recent search
+    GET  /reddit/r/all/search            Reddit search
+    GET  /articles/{slug}                news article pages (the saved fixture)
+    GET  /stats                          requests and injected errors per upstream
+
+    python -m benchmarks.stubs --port 8900 --latency openai=800 --error-rate x=0.05
+
+Latencies are in milliseconds and vary by +/- --jitter (a fraction).
+Injected errors answer with --error-status (default 503).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from . import fixtures
+
+UPSTREAMS = ("openai", "x", "reddit", "article")
+DEFAULT_LATENCY_MS = {"openai": 800.0, "x": 150.0, "reddit": 200.0, "article": 120.0}
+
+
+class Fault:
+    """Latency and error injection for one upstream."""
+
+    def __init__(self, latency_ms: float, jitter: float = 0.25, error_rate: float = 0.0, error_status: int = 503):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+
+    async def apply(self, rng: random.Random) -> Optional[Response]:
+        """Sleeps for the injected latency; returns an error response when this request should fail."""
+        self.requests += 1
+        delay = self.latency_ms * (1 + rng.uniform(-self.jitter, self.jitter)) / 1000
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rng.random() < self.error_rate:
+            self.errors += 1
+            return JSONResponse({"error": "injected failure"}, status_code=self.error_status)
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        return {"latency_ms": self.latency_ms, "error_rate": self.error_rate, "requests": self.requests, "errors": self.errors}
+
+
+def _stable_int(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def _posts(query: str, count: int, prefix: str) -> List[Dict[str, str]]:
+    seed = _stable_int(query)
+    return [{"id": f"{prefix}{seed + i}", "text": f"Post {i + 1} discussing {query}"} for i in range(count)]
+
+
+def create_stub_app(faults: Dict[str, Fault], seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Benchmark upstream stubs")
+    rng = random.Random(seed)
+    article_template = fixtures.article_html().decode("utf-8")
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if (error := await faults["openai"].apply(rng)) is not None:
+            return error
+        text = body["messages"][-1]["content"]
+        verdict = "Fake" if _stable_int(text) % 2 else "Real"
+        content = {
+            "verdict": verdict,
+            "confidence": 60 + _stable_int(text) % 40,
+            "explanation": f"Stub analysis: the text reads as {verdict.lower()} news.",
+            "highlighted": [],
+            "key_indicators": ["stub indicator one", "stub indicator two", "stub indicator three"],
+        }
+        return {
+            "id": f"chatcmpl-{_stable_int(text):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(text) // 4, "completion_tokens": 80, "total_tokens": len(text) // 4 + 80},
+        }
+
+    @app.get("/x/2/tweets/search/recent")
+    async def x_search(query: str, max_results: int = 10):
+        if (error := await faults["x"].apply(rng)) is not None:
+            return error
+        posts = _posts(query, max_results, "17")
+        # Plenty of quota, so the app's own token bucket is what limits the rate.
+        headers = {"x-rate-limit-remaining": "1000", "x-rate-limit-reset": str(int(time.time()) + 900)}
+        return JSONResponse({"data": posts, "meta": {"result_count": len(posts)}}, headers=headers)
+
+    @app.get("/reddit/r/all/search")
+    async def reddit_search(q: str, limit: int = 25):
+        if (error := await faults["reddit"].apply(rng)) is not None:
+            return error
+        children = [
+            {"kind": "t3", "data": {"id": post["id"], "title": post["text"], "score": 1 + i * 10, "permalink": f"/r/news/comments/{post['id']}/"}}
+            for i, post in enumerate(_posts(q, limit, "t3_"))
+        ]
+        headers = {"x-ratelimit-remaining": "600", "x-ratelimit-reset": "600"}
+        return JSONResponse({"kind": "Listing", "data": {"children": children}}, headers=headers)
+
+    @app.get("/articles/{slug}")
+    async def article(slug: str):
+        if (error := await faults["article"].apply(rng)) is not None:
+            return error
+        # A slug-specific paragraph, so different URLs don't share one verdict cache entry.
+        extra = f'        <p>{fixtures.news_text(400, seed=_stable_int(slug))}</p>\n'
+        html = article_template.replace("<title>", f"<title>[{slug}] ", 1).replace('        <div class="share">', extra + '        <div class="share">', 1)
+        return Response(html, media_type="text/html; charset=utf-8", headers={"Cache-Control": "max-age=60"})
+
+    @app.get("/stats")
+    async def stats():
+        return {name: fault.stats() for name, fault in faults.items()}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+
+def parse_assignments(values: List[str], option: str) -> Dict[str, float]:
+    """["openai=800", "x=150"] -> {"openai": 800.0, "x": 150.0}; "all=..." applies to every upstream."""
+    parsed: Dict[str, float] = {}
+    for value in values:
+        name, sep, number = value.partition("=")
+        if not sep or (name not in UPSTREAMS and name != "all"):
+            raise SystemExit(f"{option} expects UPSTREAM=VALUE with UPSTREAM in {', '.join(UPSTREAMS)} or 'all', got {value!r}")
+        for upstream in (UPSTREAMS if name == "all" else (name,)):
+            parsed[upstream] = float(number)
+    return parsed
+
+
+def add_fault_arguments(parser):
+    parser.add_argument("--latency", action="append", default=[], metavar="UPSTREAM=MS", help="Injected latency (default: openai=800 x=150 reddit=200 article=120).")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="UPSTREAM=FRACTION", help="Share of requests answered with --error-status.")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Latency varies by +/- this fraction (default 0.25).")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected errors (default 503).")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def faults_from_args(args) -> Dict[str, Fault]:
+    latency = {**DEFAULT_LATENCY_MS, **parse_assignments(args.latency, "--latency")}
+    error_rate = parse_assignments(args.error_rate, "--error-rate")
+    return {name: Fault(latency[name], args.jitter, error_rate.get(name, 0.0), args.error_status) for name in UPSTREAMS}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for OpenAI, X, Reddit and article hosts.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    app = create_stub_app(faults_from_args(args), args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()